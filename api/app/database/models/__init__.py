@@ -2,8 +2,11 @@
 
 from ..connection import Base
 from .frame_result import FrameResult
+from .job_failure import JobFailure
+from .job_timing import JobTiming
 from .payment import Payment
 from .processing_job import ProcessingJob
+from .result_cache import ResultCacheEntry
 from .session import Session
 from .subscription import Subscription
 from .user import User
@@ -16,6 +19,9 @@ __all__ = [
     "VideoFile",
     "ProcessingJob",
     "FrameResult",
+    "JobFailure",
+    "JobTiming",
+    "ResultCacheEntry",
     "Subscription",
     "Payment",
 ]
@@ -0,0 +1,32 @@
+"""JobFailure database model"""
+
+import uuid as uuid_pkg
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from ..connection import Base
+
+
+class JobFailure(Base):
+    """Failed attempt at running a processing job"""
+
+    __tablename__ = "job_failures"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid_pkg.uuid4)
+    processing_job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("processing_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    attempt = Column(Integer, nullable=False)
+    worker_id = Column(String(255))
+    error = Column(Text, nullable=False)
+
+    failed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    processing_job = relationship("ProcessingJob", back_populates="failures")
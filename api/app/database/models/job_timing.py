@@ -0,0 +1,52 @@
+"""JobTiming database model"""
+
+import uuid as uuid_pkg
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from ..connection import Base
+
+
+class JobTiming(Base):
+    """Time spent in each stage of a completed processing job
+
+    Recorded with the request parameters and video metadata the time
+    depends on, as training data for TimeEstimator.
+    """
+
+    __tablename__ = "job_timings"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid_pkg.uuid4)
+    processing_job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("processing_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Request parameters
+    mode = Column(String(50), nullable=False)
+    quality = Column(String(50), nullable=False)
+    sampling = Column(String(50), nullable=False)
+    sample_rate = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    # Video metadata
+    width = Column(Integer)
+    height = Column(Integer)
+    fps = Column(Float)
+    frame_count = Column(Integer)
+    duration = Column(Float)
+    codec = Column(String(16))
+
+    # Seconds per stage: decoding includes the full resolution decode of the
+    # selected frames, encoding the tier restrictions applied to them
+    frames_analyzed = Column(Integer, nullable=False)
+    decode_seconds = Column(Float, nullable=False)
+    score_seconds = Column(Float, nullable=False)
+    encode_seconds = Column(Float, nullable=False)
+    save_seconds = Column(Float, nullable=False)
+    total_seconds = Column(Float, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
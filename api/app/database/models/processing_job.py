@@ -31,15 +31,31 @@ class ProcessingJob(Base):
     mode = Column(String(50), nullable=False)
     quality = Column(String(50), nullable=False)
     count = Column(Integer, nullable=False)
+    sampling = Column(String(50), nullable=False, default="frames")
     sample_rate = Column(Integer, nullable=False)
     min_interval = Column(Float, nullable=False)
 
+    # Scheduling: tier of the owner (a user, or the session of an anonymous
+    # user) when the job was created and the resulting priority class
+    tier = Column(String(50), nullable=False, default="FREE")
+    priority = Column(Integer, nullable=False, default=0)
+    owner_key = Column(String(255))
+
     # Job status
     status = Column(String(50), nullable=False, default="pending")
     progress = Column(Integer, default=0)
     error = Column(Text)
     estimated_time = Column(Integer)
 
+    # Queue state: the worker running the job holds it until lease_expires_at
+    # and renews the lease with each heartbeat. Requeued jobs are not claimed
+    # again before available_at.
+    worker_id = Column(String(255))
+    lease_expires_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    available_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, default=0)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
@@ -50,3 +66,6 @@ class ProcessingJob(Base):
     frame_results = relationship(
         "FrameResult", back_populates="processing_job", cascade="all, delete-orphan"
     )
+    failures = relationship(
+        "JobFailure", back_populates="processing_job", cascade="all, delete-orphan"
+    )
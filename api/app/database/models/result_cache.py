@@ -0,0 +1,39 @@
+"""ResultCacheEntry database model"""
+
+import uuid as uuid_pkg
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from ..connection import Base
+
+
+class ResultCacheEntry(Base):
+    """Frames selected for a video's content and processing parameters"""
+
+    __tablename__ = "result_cache"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid_pkg.uuid4)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    content_hash = Column(String(64), index=True, nullable=False)
+
+    # Processing parameters
+    mode = Column(String(50), nullable=False)
+    quality = Column(String(50), nullable=False)
+    sampling = Column(String(50), nullable=False)
+    sample_rate = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+    min_interval = Column(Float, nullable=False)
+    algorithm_version = Column(String(50), nullable=False)
+
+    # Cached frame files and their results, one dict per frame
+    directory = Column(String(500), nullable=False)
+    frames = Column(JSONB, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False, default=0)
+
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
@@ -26,6 +26,7 @@ class VideoFile(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer)
     content_type = Column(String(100))
+    content_hash = Column(String(64), index=True)  # SHA-256 of the file
 
     # Video metadata
     duration = Column(Float)
@@ -34,6 +35,7 @@ class VideoFile(Base):
     height = Column(Integer)
     frame_count = Column(Integer)
     format = Column(String(50))
+    codec = Column(String(16))  # FourCC reported by the decoder
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
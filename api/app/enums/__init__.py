@@ -3,6 +3,7 @@
 from .mode import ModeEnum
 from .payment_status import PaymentStatusEnum
 from .quality import QualityEnum
+from .sampling import SamplingEnum
 from .status import StatusEnum
 from .subscription_status import SubscriptionStatusEnum
 from .subscription_type import SubscriptionTypeEnum
@@ -12,6 +13,7 @@ __all__ = [
     "ModeEnum",
     "PaymentStatusEnum",
     "QualityEnum",
+    "SamplingEnum",
     "StatusEnum",
     "SubscriptionStatusEnum",
     "SubscriptionTypeEnum",
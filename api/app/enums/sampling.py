@@ -0,0 +1,16 @@
+"""
+Frame sampling modes for video analysis
+"""
+
+from enum import Enum
+
+
+class SamplingEnum(str, Enum):
+    """How the sample rate is applied when extracting frames"""
+
+    frames = "frames"  # every Nth frame
+    fps = "fps"  # N frames per second of video
+    budget = "budget"  # N frames in total, spread evenly
+
+    def __str__(self) -> str:
+        return self.value
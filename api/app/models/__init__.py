@@ -7,6 +7,7 @@ from ..enums import (
     ModeEnum,
     PaymentStatusEnum,
     QualityEnum,
+    SamplingEnum,
     StatusEnum,
     SubscriptionStatusEnum,
     SubscriptionTypeEnum,
@@ -27,6 +28,8 @@ from .schemas import (
     PaymentResponse,
     ProcessRequest,
     ProcessResponse,
+    QueueMetrics,
+    RerankRequest,
     SessionCreate,
     SessionResponse,
     SessionStatus,
@@ -63,6 +66,8 @@ __all__ = [
     "FrameResult",
     "ProcessRequest",
     "ProcessResponse",
+    "QueueMetrics",
+    "RerankRequest",
     # Session models
     "SessionCreate",
     "SessionResponse",
@@ -74,6 +79,7 @@ __all__ = [
     "ModeEnum",
     "PaymentStatusEnum",
     "QualityEnum",
+    "SamplingEnum",
     "StatusEnum",
     "SubscriptionStatusEnum",
     "SubscriptionTypeEnum",
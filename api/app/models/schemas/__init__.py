@@ -17,7 +17,13 @@ from .billing import (
 )
 
 # Processing models
-from .processing import FrameResult, ProcessRequest, ProcessResponse
+from .processing import (
+    FrameResult,
+    ProcessRequest,
+    ProcessResponse,
+    QueueMetrics,
+    RerankRequest,
+)
 
 # Session models
 from .session import SessionCreate, SessionResponse, SessionStatus
@@ -48,6 +54,8 @@ __all__ = [
     "FrameResult",
     "ProcessRequest",
     "ProcessResponse",
+    "QueueMetrics",
+    "RerankRequest",
     # Session models
     "SessionCreate",
     "SessionResponse",
@@ -1,10 +1,17 @@
 """Processing related schemas"""
 
-from typing import Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
-from ...enums import ModeEnum, QualityEnum
+from ...enums import ModeEnum, QualityEnum, SamplingEnum
+
+# Upper bound on sample_rate for each sampling mode
+SAMPLE_RATE_LIMITS = {
+    SamplingEnum.frames: 60,
+    SamplingEnum.fps: 30,
+    SamplingEnum.budget: 1000,
+}
 
 
 class ProcessRequest(BaseModel):
@@ -19,8 +26,14 @@ class ProcessRequest(BaseModel):
     count: int = Field(
         default=1, ge=1, le=10, description="Number of frames to extract (1-10)"
     )
+    sampling: SamplingEnum = Field(
+        default=SamplingEnum.frames,
+        description="How sample_rate is applied: every Nth frame, N per second or N in total",
+    )
     sample_rate: int = Field(
-        default=30, ge=1, le=60, description="Extract every Nth frame"
+        default=30,
+        ge=1,
+        description="Every Nth frame (frames), samples per second (fps) or total samples (budget)",
     )
     min_interval: float = Field(
         default=2.0,
@@ -29,18 +42,67 @@ class ProcessRequest(BaseModel):
         description="Minimum interval between frames in seconds",
     )
 
+    @model_validator(mode="after")
+    def check_sample_rate(self) -> "ProcessRequest":
+        """Validate sample_rate against the limit of the sampling mode"""
+        limit = SAMPLE_RATE_LIMITS[self.sampling]
+        if self.sample_rate > limit:
+            raise ValueError(
+                f"sample_rate must be at most {limit} for {self.sampling} sampling"
+            )
+        return self
+
     class Config:
         json_schema_extra = {
             "example": {
                 "mode": "profile",
                 "quality": "balanced",
                 "count": 3,
+                "sampling": "frames",
                 "sample_rate": 30,
                 "min_interval": 2.0,
             }
         }
 
 
+class RerankRequest(BaseModel):
+    """Request model for selecting frames again from stored scores"""
+
+    count: int = Field(
+        default=1, ge=1, le=10, description="Number of frames to extract (1-10)"
+    )
+    min_interval: float = Field(
+        default=2.0,
+        ge=0.5,
+        le=10.0,
+        description="Minimum interval between frames in seconds",
+    )
+    weights: Optional[Dict[str, float]] = Field(
+        default=None,
+        description=(
+            'Weight overrides per metric, e.g. {"sharpness": 0.2, "face": 0.3}; '
+            "with the other weights of the mode they must add up to at most 1"
+        ),
+    )
+
+    @model_validator(mode="after")
+    def check_weights(self) -> "RerankRequest":
+        """Validate that weights are between 0 and 1"""
+        for name, weight in (self.weights or {}).items():
+            if not 0.0 <= weight <= 1.0:
+                raise ValueError(f"weight of {name} must be between 0 and 1")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "count": 5,
+                "min_interval": 1.0,
+                "weights": {"sharpness": 0.4, "face": 0.1},
+            }
+        }
+
+
 class ProcessResponse(BaseModel):
     """Response model for processing requests"""
 
@@ -50,6 +112,17 @@ class ProcessResponse(BaseModel):
     estimated_time: Optional[int] = None  # in seconds
 
 
+class QueueMetrics(BaseModel):
+    """Processing queue length and wait times of one tier"""
+
+    tier: str
+    pending_jobs: int
+    running_jobs: int
+    oldest_pending_wait: Optional[float] = None  # in seconds
+    average_wait: Optional[float] = None  # in seconds, of recently started jobs
+    p95_wait: Optional[float] = None  # in seconds, of recently started jobs
+
+
 class FrameResult(BaseModel):
     """Model for individual frame results"""
 
@@ -1,7 +1,9 @@
 """Repository pattern implementations"""
 
+from .job_timing_repository import JobTimingRepository
 from .payment_repository import PaymentRepository
 from .processing_repository import ProcessingRepository
+from .result_cache_repository import ResultCacheRepository
 from .session_repository import SessionRepository
 from .subscription_repository import SubscriptionRepository
 from .user_repository import UserRepository
@@ -14,4 +16,6 @@ __all__ = [
     "UserRepository",
     "SubscriptionRepository",
     "PaymentRepository",
+    "ResultCacheRepository",
+    "JobTimingRepository",
 ]
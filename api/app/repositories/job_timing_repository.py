@@ -0,0 +1,26 @@
+"""
+Job timing repository
+"""
+
+from typing import List
+
+from sqlalchemy.orm import Session as DBSession
+
+from ..database.models import JobTiming
+from .base import BaseRepository
+
+
+class JobTimingRepository(BaseRepository[JobTiming]):
+    """Repository for stage timings of completed jobs"""
+
+    def __init__(self, db: DBSession):
+        super().__init__(JobTiming, db)
+
+    def get_recent(self, limit: int) -> List[JobTiming]:
+        """Get the timings of the most recently completed jobs"""
+        return (
+            self.db.query(JobTiming)
+            .order_by(JobTiming.created_at.desc())
+            .limit(limit)
+            .all()
+        )
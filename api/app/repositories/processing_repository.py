@@ -2,58 +2,450 @@
 Processing job repository
 """
 
-from typing import List, Optional
+from datetime import timedelta
+from typing import Dict, List, Optional
 
+from sqlalchemy import case, or_
 from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.sql import func
 
-from ..database.models import FrameResult, ProcessingJob
+from ..database.models import FrameResult, JobFailure, ProcessingJob
 from .base import BaseRepository
 
 
+class JobLeaseLost(Exception):
+    """The job is no longer running under the worker writing to it"""
+
+
 class ProcessingRepository(BaseRepository[ProcessingJob]):
     """Repository for processing job operations"""
 
+    # Priority classes of jobs; tiers with priority_processing get the highest
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 1
+
     def __init__(self, db: DBSession):
         super().__init__(ProcessingJob, db)
 
     def create_processing_job(
-        self, session_id: str, video_file_id: str, params: dict
+        self,
+        session_id: str,
+        video_file_id: str,
+        params: dict,
+        tier: str,
+        priority: int,
+        owner_key: str,
+        estimated_time: Optional[int] = None,
+        status: str = "pending",
     ) -> ProcessingJob:
-        """Create new processing job"""
+        """
+        Create new processing job
+
+        Only "pending" jobs are claimed by workers; jobs completed outside the
+        queue are created "running", so no worker picks them up meanwhile.
+        """
         return self.create(
             session_id=session_id,
             video_file_id=video_file_id,
+            tier=tier,
+            priority=priority,
+            owner_key=owner_key,
+            estimated_time=estimated_time,
             mode=params["mode"],
             quality=params["quality"],
             count=params["count"],
+            sampling=params["sampling"],
             sample_rate=params["sample_rate"],
             min_interval=params["min_interval"],
-            status="pending",
+            status=status,
         )
 
     def get_by_session_id(self, session_id: str) -> List[ProcessingJob]:
-        """Get processing jobs by session ID"""
+        """Get processing jobs by session ID, newest first"""
         return (
             self.db.query(ProcessingJob)
             .filter(ProcessingJob.session_id == session_id)
+            .order_by(ProcessingJob.created_at.desc())
+            .all()
+        )
+
+    def claim_next_job(
+        self, worker_id: str, lease_seconds: int, aging_seconds: int
+    ) -> Optional[ProcessingJob]:
+        """
+        Take the next available pending job and mark it running for worker_id
+
+        Jobs are ordered by:
+
+        1. Priority class, raised by one for every aging_seconds a job has
+           waited up to PRIORITY_HIGH, so that no job waits much longer than
+           aging_seconds behind a stream of higher priority jobs
+        2. Load of the job's owner: jobs the owner already has running plus
+           the job's position among the owner's pending jobs, so one user's
+           bulk upload takes turns with everyone else's jobs
+        3. Age, oldest first
+
+        The row is locked with FOR UPDATE SKIP LOCKED, so concurrent workers
+        each claim a different job without waiting on one another. Requeued
+        jobs are skipped until their backoff has passed.
+
+        Returns:
+            The claimed job, or None if no job is pending
+        """
+        running = (
+            self.db.query(ProcessingJob.owner_key, func.count().label("running_jobs"))
+            .filter(ProcessingJob.status == "running")
+            .group_by(ProcessingJob.owner_key)
+            .subquery()
+        )
+
+        waited = func.extract("epoch", func.now() - ProcessingJob.created_at)
+        ranked = (
+            self.db.query(
+                ProcessingJob.id,
+                func.least(
+                    ProcessingJob.priority + func.floor(waited / aging_seconds),
+                    self.PRIORITY_HIGH,
+                ).label("effective_priority"),
+                (
+                    func.row_number().over(
+                        partition_by=ProcessingJob.owner_key,
+                        order_by=ProcessingJob.created_at,
+                    )
+                    + func.coalesce(running.c.running_jobs, 0)
+                ).label("owner_load"),
+            )
+            .outerjoin(running, running.c.owner_key == ProcessingJob.owner_key)
+            .filter(
+                ProcessingJob.status == "pending",
+                or_(
+                    ProcessingJob.available_at.is_(None),
+                    ProcessingJob.available_at <= func.now(),
+                ),
+            )
+            .subquery()
+        )
+
+        job = (
+            self.db.query(ProcessingJob)
+            .join(ranked, ranked.c.id == ProcessingJob.id)
+            # Checked again on the locked row, which may have been claimed
+            # since the ranking was computed
+            .filter(ProcessingJob.status == "pending")
+            .order_by(
+                ranked.c.effective_priority.desc(),
+                ranked.c.owner_load,
+                ProcessingJob.created_at,
+            )
+            .with_for_update(of=ProcessingJob, skip_locked=True)
+            .first()
+        )
+        if job is None:
+            # End the transaction holding the empty lock
+            self.db.rollback()
+            return None
+
+        return self.update(
+            job,
+            status="running",
+            worker_id=worker_id,
+            lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+            heartbeat_at=func.now(),
+            attempts=job.attempts + 1,
+            started_at=func.now(),
+        )
+
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Record a heartbeat of a running job held by worker_id, extending its lease
+
+        Returns:
+            False if the job is no longer running under this worker
+        """
+        renewed = (
+            self.db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.id == job_id,
+                ProcessingJob.worker_id == worker_id,
+                ProcessingJob.status == "running",
+            )
+            .update(
+                {
+                    ProcessingJob.lease_expires_at: func.now()
+                    + timedelta(seconds=lease_seconds),
+                    ProcessingJob.heartbeat_at: func.now(),
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return renewed > 0
+
+    def requeue_expired_jobs(
+        self, max_attempts: int, backoff_seconds: int
+    ) -> List[ProcessingJob]:
+        """
+        Requeue running jobs whose lease expired, as their worker is gone
+
+        Each expiry is recorded as a failed attempt, and the results the
+        attempt saved so far are deleted. Jobs are retried after a backoff
+        that doubles with every attempt, and fail for good once they have
+        been attempted max_attempts times.
+
+        Returns:
+            The expired jobs, now "pending" or "failed"
+        """
+        jobs = (
+            self.db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.status == "running",
+                ProcessingJob.lease_expires_at < func.now(),
+            )
+            .with_for_update(skip_locked=True)
             .all()
         )
 
+        for job in jobs:
+            self._requeue(
+                job,
+                f"Worker {job.worker_id} stopped sending heartbeats",
+                max_attempts,
+                backoff_seconds,
+            )
+
+        self.db.commit()
+        return jobs
+
+    def requeue_timed_out_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        error: str,
+        max_attempts: int,
+        backoff_seconds: int,
+    ) -> Optional[ProcessingJob]:
+        """
+        Requeue a job running under worker_id that is taking too long
+
+        Handled like an expired lease (see requeue_expired_jobs), with error
+        recorded as the reason; the job's process can no longer write to it.
+
+        Returns:
+            The job, now "pending" or "failed", or None if it was no longer
+            running under worker_id
+        """
+        job = (
+            self.db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.id == job_id,
+                ProcessingJob.worker_id == worker_id,
+                ProcessingJob.status == "running",
+            )
+            .with_for_update()
+            .first()
+        )
+        if job is not None:
+            self._requeue(job, error, max_attempts, backoff_seconds)
+        self.db.commit()
+        return job
+
+    def _requeue(
+        self, job: ProcessingJob, error: str, max_attempts: int, backoff_seconds: int
+    ) -> None:
+        """Record a failed attempt at a locked job and retry or fail it"""
+        self.db.add(
+            JobFailure(
+                processing_job_id=job.id,
+                attempt=job.attempts,
+                worker_id=job.worker_id,
+                error=error,
+            )
+        )
+
+        # The worker may still be writing them; fenced writes fail from now
+        job.frame_results.clear()
+        job.worker_id = None
+        job.lease_expires_at = None
+        if job.attempts >= max_attempts:
+            job.status = "failed"
+            job.error = f"{error} (gave up after {job.attempts} attempts)"
+            job.completed_at = func.now()
+        else:
+            job.status = "pending"
+            job.progress = 0
+            job.available_at = func.now() + timedelta(
+                seconds=backoff_seconds * 2 ** (job.attempts - 1)
+            )
+
+    def get_backlog(self, min_priority: int) -> Dict:
+        """
+        Queued work ahead of a new job of priority min_priority
+
+        Returns:
+            Number of pending jobs, estimated seconds of the pending jobs of
+            at least min_priority and estimated seconds left of running jobs
+        """
+        pending = ProcessingJob.status == "pending"
+        running = ProcessingJob.status == "running"
+        remaining = (
+            ProcessingJob.estimated_time
+            * (100 - func.coalesce(ProcessingJob.progress, 0))
+            / 100.0
+        )
+
+        row = (
+            self.db.query(
+                func.count().filter(pending).label("pending_jobs"),
+                func.coalesce(
+                    func.sum(ProcessingJob.estimated_time).filter(
+                        pending, ProcessingJob.priority >= min_priority
+                    ),
+                    0,
+                ).label("pending_seconds"),
+                func.coalesce(func.sum(remaining).filter(running), 0).label(
+                    "running_seconds"
+                ),
+            )
+            .filter(or_(pending, running))
+            .one()
+        )
+        return {
+            "pending_jobs": row.pending_jobs,
+            "pending_seconds": float(row.pending_seconds),
+            "running_seconds": float(row.running_seconds),
+        }
+
+    def get_queue_metrics(self, window: timedelta) -> List[Dict]:
+        """
+        Queue length and wait times per tier
+
+        Wait is the time from creating a job to its (latest) start; averages
+        and percentiles cover the jobs started within window.
+        """
+        recent_wait = case(
+            (
+                ProcessingJob.started_at >= func.now() - window,
+                func.extract(
+                    "epoch", ProcessingJob.started_at - ProcessingJob.created_at
+                ),
+            )
+        )
+        pending = ProcessingJob.status == "pending"
+
+        rows = (
+            self.db.query(
+                ProcessingJob.tier,
+                func.count().filter(pending).label("pending_jobs"),
+                func.count()
+                .filter(ProcessingJob.status == "running")
+                .label("running_jobs"),
+                func.max(func.extract("epoch", func.now() - ProcessingJob.created_at))
+                .filter(pending)
+                .label("oldest_pending_wait"),
+                func.avg(recent_wait).label("average_wait"),
+                func.percentile_cont(0.95).within_group(recent_wait).label("p95_wait"),
+            )
+            .filter(
+                or_(
+                    ProcessingJob.status.in_(("pending", "running")),
+                    ProcessingJob.started_at >= func.now() - window,
+                )
+            )
+            .group_by(ProcessingJob.tier)
+            .order_by(ProcessingJob.tier)
+            .all()
+        )
+        return [row._asdict() for row in rows]
+
+    def record_failure(self, job: ProcessingJob, error: str) -> JobFailure:
+        """Record a failed attempt at running a job"""
+        failure = JobFailure(
+            processing_job_id=job.id,
+            attempt=job.attempts,
+            worker_id=job.worker_id,
+            error=error,
+        )
+
+        self.db.add(failure)
+        self.db.commit()
+        self.db.refresh(failure)
+        return failure
+
     def update_job_status(
-        self, job: ProcessingJob, status: str, progress: int = None, error: str = None
+        self,
+        job: ProcessingJob,
+        status: str,
+        progress: int = None,
+        error: str = None,
+        worker_id: Optional[str] = None,
     ) -> ProcessingJob:
-        """Update processing job status"""
+        """
+        Update processing job status
+
+        With worker_id, the job is only updated while it is running under
+        that worker; JobLeaseLost is raised otherwise, e.g. once the job was
+        requeued after the worker missed its heartbeats.
+        """
         update_data = {"status": status}
 
         if progress is not None:
             update_data["progress"] = progress
         if error is not None:
             update_data["error"] = error
+        if status in ("completed", "failed"):
+            # Finished jobs no longer hold a lease
+            update_data["lease_expires_at"] = None
+            update_data["completed_at"] = func.now()
+
+        if worker_id is None:
+            return self.update(job, **update_data)
+
+        updated = (
+            self.db.query(ProcessingJob)
+            .filter(
+                ProcessingJob.id == job.id,
+                ProcessingJob.worker_id == worker_id,
+                ProcessingJob.status == "running",
+            )
+            .update(
+                {
+                    getattr(ProcessingJob, field): value
+                    for field, value in update_data.items()
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        if not updated:
+            raise JobLeaseLost(f"Job {job.id} is not running under {worker_id}")
+
+        self.db.refresh(job)
+        return job
+
+    def add_frame_result(
+        self, job_id: str, frame_data: dict, worker_id: Optional[str] = None
+    ) -> FrameResult:
+        """
+        Add frame result to processing job
 
-        return self.update(job, **update_data)
+        With worker_id, the job row is locked until the result is committed,
+        and JobLeaseLost is raised unless it is running under that worker.
+        """
+        if worker_id is not None:
+            held = (
+                self.db.query(ProcessingJob.id)
+                .filter(
+                    ProcessingJob.id == job_id,
+                    ProcessingJob.worker_id == worker_id,
+                    ProcessingJob.status == "running",
+                )
+                .with_for_update()
+                .first()
+            )
+            if held is None:
+                self.db.rollback()
+                raise JobLeaseLost(f"Job {job_id} is not running under {worker_id}")
 
-    def add_frame_result(self, job_id: str, frame_data: dict) -> FrameResult:
-        """Add frame result to processing job"""
         frame_result = FrameResult(
             processing_job_id=job_id,
             frame_index=frame_data["frame_index"],
@@ -0,0 +1,47 @@
+"""
+Result cache repository
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session as DBSession
+
+from ..database.models import ResultCacheEntry
+from .base import BaseRepository
+
+
+class ResultCacheRepository(BaseRepository[ResultCacheEntry]):
+    """Repository for cached processing results"""
+
+    def __init__(self, db: DBSession):
+        super().__init__(ResultCacheEntry, db)
+
+    def get_by_key(self, cache_key: str) -> Optional[ResultCacheEntry]:
+        """Get cache entry by cache key"""
+        return (
+            self.db.query(ResultCacheEntry)
+            .filter(ResultCacheEntry.cache_key == cache_key)
+            .first()
+        )
+
+    def mark_used(self, entry: ResultCacheEntry) -> ResultCacheEntry:
+        """Record a cache hit"""
+        return self.update(
+            entry, hit_count=entry.hit_count + 1, last_used_at=func.now()
+        )
+
+    def total_size(self) -> int:
+        """Total size of all cached frames in bytes"""
+        return self.db.query(
+            func.coalesce(func.sum(ResultCacheEntry.size_bytes), 0)
+        ).scalar()
+
+    def get_least_recently_used(self, limit: int = 100) -> List[ResultCacheEntry]:
+        """Get cache entries, least recently used first"""
+        return (
+            self.db.query(ResultCacheEntry)
+            .order_by(ResultCacheEntry.last_used_at.asc())
+            .limit(limit)
+            .all()
+        )
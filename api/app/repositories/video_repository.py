@@ -29,10 +29,12 @@ class VideoRepository(BaseRepository[VideoFile]):
             file_path=file_info.get("file_path"),
             file_size=file_info.get("file_size"),
             content_type=file_info.get("content_type"),
+            content_hash=file_info.get("content_hash"),
             duration=file_info.get("duration"),
             fps=file_info.get("fps"),
             width=file_info.get("width"),
             height=file_info.get("height"),
             frame_count=file_info.get("frame_count"),
             format=file_info.get("format"),
+            codec=file_info.get("codec"),
         )
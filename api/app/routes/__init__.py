@@ -6,6 +6,7 @@ from .auth import router as auth_router
 from .billing import router as billing_router
 from .download import router as download_router
 from .processing import router as processing_router
+from .queue import router as queue_router
 from .sessions import router as sessions_router
 from .upload import router as upload_router
 
@@ -20,6 +21,7 @@ def create_api_router() -> APIRouter:
     api_router.include_router(upload_router)
     api_router.include_router(processing_router)
     api_router.include_router(download_router)
+    api_router.include_router(queue_router)
 
     return api_router
 
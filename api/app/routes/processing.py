@@ -2,7 +2,7 @@
 
 from typing import List
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from ..dependencies import (
     get_current_user_optional,
@@ -10,7 +10,13 @@ from ..dependencies import (
     get_session_service,
     get_usage_service,
 )
-from ..models import CurrentUser, FrameResult, ProcessRequest, ProcessResponse
+from ..models import (
+    CurrentUser,
+    FrameResult,
+    ProcessRequest,
+    ProcessResponse,
+    RerankRequest,
+)
 from ..services.processing_service import ProcessingService
 from ..services.session_service import SessionService
 from ..services.usage_service import UsageService
@@ -22,13 +28,12 @@ router = APIRouter(prefix="/sessions", tags=["processing"])
 async def process_video(
     session_id: str,
     request: ProcessRequest,
-    background_tasks: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user_optional),
     session_service: SessionService = Depends(get_session_service),
     processing_service: ProcessingService = Depends(get_processing_service),
     usage_service: UsageService = Depends(get_usage_service),
 ):
-    """Start video processing with specified parameters"""
+    """Queue video processing with specified parameters"""
     try:
         # Validate session and check if video is uploaded
         session = await session_service.get_session(session_id)
@@ -58,24 +63,43 @@ async def process_video(
                     detail=f"Daily limit exceeded. Anonymous users can process {limits['limit']} video per day.",
                 )
 
+        # Refuse work the queue cannot finish in time
+        capacity = await processing_service.check_capacity(session_id, request)
+        if not capacity["can_process"]:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Processing queue is full. Please retry in {capacity['retry_after']} seconds.",
+                headers={"Retry-After": str(capacity["retry_after"])},
+            )
+
         # Create processing job in database
         job = await processing_service.create_processing_job(session_id, request)
 
-        # Update session status to processing
-        await session_service.update_session(
-            session_id, {"status": "processing", "message": "Video processing started"}
-        )
+        # Identical video and parameters processed before: served from cache
+        if job.status == "completed":
+            await session_service.update_session(
+                session_id,
+                {
+                    "status": "completed",
+                    "message": "Processing completed successfully (cached result).",
+                    "progress": 100,
+                },
+            )
+            return ProcessResponse(
+                session_id=session_id,
+                status="completed",
+                message="Processing completed from cached results",
+                estimated_time=0,
+            )
 
-        # Start background processing
-        background_tasks.add_task(
-            processing_service.process_video_background, job.id, request
-        )
+        # The pending job is picked up by a worker (frame-picker-worker); the
+        # session was marked processing along with it
 
         return ProcessResponse(
             session_id=session_id,
             status="processing",
             message="Video processing started",
-            estimated_time=30,
+            estimated_time=capacity["estimated_time"],
         )
 
     except HTTPException:
@@ -98,3 +122,36 @@ async def get_results(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get results: {str(e)}")
+
+
+@router.post("/{session_id}/rerank", response_model=List[FrameResult])
+async def rerank_frames(
+    session_id: str,
+    request: RerankRequest,
+    current_user: CurrentUser = Depends(get_current_user_optional),
+    session_service: SessionService = Depends(get_session_service),
+    processing_service: ProcessingService = Depends(get_processing_service),
+):
+    """Select frames again from stored scores, without analyzing the video"""
+    try:
+        session = await session_service.get_session(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Sessions of signed-in users can only be re-ranked by their owner
+        owner_id = session.get("user_id")
+        if owner_id and (not current_user or str(current_user.id) != owner_id):
+            raise HTTPException(status_code=403, detail="Not your session")
+
+        # Re-ranking reuses a processed video, already counted towards usage
+        if session.get("status") != "completed":
+            raise HTTPException(status_code=400, detail="Processing not completed yet")
+
+        return await processing_service.rerank(session_id, request)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Re-ranking failed: {str(e)}")
@@ -0,0 +1,25 @@
+"""Processing queue endpoints"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..dependencies import get_processing_service
+from ..models import QueueMetrics
+from ..services.processing_service import ProcessingService
+
+router = APIRouter(prefix="/queue", tags=["queue"])
+
+
+@router.get("/metrics", response_model=List[QueueMetrics])
+async def get_queue_metrics(
+    processing_service: ProcessingService = Depends(get_processing_service),
+):
+    """Processing queue length and wait times per tier"""
+    try:
+        return await processing_service.get_queue_metrics()
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get queue metrics: {str(e)}"
+        )
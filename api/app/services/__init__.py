@@ -1,8 +1,11 @@
 """Services package for Frame Picker API"""
 
 from .billing_service import BillingService
+from .job_executor import JobExecutor
 from .processing_service import ProcessingService
+from .result_cache_service import ResultCacheService
 from .session_service import SessionService
+from .time_estimator import TimeEstimator
 from .usage_service import UsageService
 from .video_service import VideoService
 
@@ -12,4 +15,7 @@ __all__ = [
     "ProcessingService",
     "UsageService",
     "BillingService",
+    "ResultCacheService",
+    "JobExecutor",
+    "TimeEstimator",
 ]
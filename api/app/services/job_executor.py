@@ -0,0 +1,92 @@
+"""
+Process pool running video processing jobs outside the API process
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from ..config import settings
+from ..database.connection import SessionLocal
+from ..models import ProcessRequest
+from .processing_service import ProcessingService
+
+
+def _init_worker() -> None:
+    """Leave interrupts to the parent, which lets running jobs finish"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_processing_job(
+    job_id, request: ProcessRequest, worker_id: Optional[str] = None
+) -> None:
+    """Worker process entry point: process one job with its own DB session"""
+    db = SessionLocal()
+    try:
+        service = ProcessingService(db, worker_id)
+        asyncio.run(service.process_video_background(job_id, request))
+    finally:
+        db.close()
+
+
+class JobExecutor:
+    """Runs processing jobs in a pool of worker processes
+
+    Analysis is CPU-bound and blocks for the whole job, so it never runs in
+    the API process: workers (see ``api.app.worker``) claim queued jobs and
+    submit them here. Each process opens its own database connections, and
+    reports progress and results through the job and session records.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def max_workers(self) -> int:
+        """Number of job processes, by default one per core left to segments"""
+        if self.workers:
+            return self.workers
+        return max(1, (os.cpu_count() or 1) // max(1, settings.SEGMENT_WORKERS))
+
+    def submit(
+        self, job_id, request: ProcessRequest, worker_id: Optional[str] = None
+    ) -> Future:
+        """Queue a job claimed by worker_id for the next free worker"""
+        args = (run_processing_job, job_id, request, worker_id)
+        try:
+            future = self._pool().submit(*args)
+        except BrokenProcessPool:
+            # A worker process died abruptly, which breaks the whole pool
+            self.shutdown(wait=False)
+            future = self._pool().submit(*args)
+
+        future.add_done_callback(lambda f: self._report(job_id, f))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers, letting running jobs finish when wait is set"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """The process pool, started on first use"""
+        if self._executor is None:
+            # Spawned workers do not inherit the API's database connections
+            # or OpenCV's thread pool state, neither of which survive fork()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _report(self, job_id, future: Future) -> None:
+        """Log jobs whose worker failed outside of the job's own error handling"""
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Processing worker error for job {job_id}: {future.exception()}")
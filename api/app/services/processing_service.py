@@ -3,9 +3,13 @@ Video processing service that integrates with frame_picker core logic
 """
 
 import asyncio
+import io
+import math
 import sys
+import time
+from datetime import timedelta
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session as DBSession
 
@@ -15,7 +19,14 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from frame_picker.core import FrameData, FrameExtractor, FrameSelector
+    from frame_picker.core import (
+        FrameData,
+        FrameExtractor,
+        FrameSelector,
+        ProxyCache,
+        ScoredFrames,
+        score_file_path,
+    )
 
     FRAME_PICKER_AVAILABLE = True
 except ImportError as e:
@@ -23,46 +34,132 @@ except ImportError as e:
     print(f"Warning: frame_picker core not available ({e}), using mock processing")
 
 from ..config import settings
-from ..models import FrameResult, ProcessRequest
-from ..repositories.processing_repository import ProcessingRepository
+from ..models import (
+    FrameResult,
+    ProcessRequest,
+    QueueMetrics,
+    RerankRequest,
+    TierEnum,
+)
+from ..repositories.job_timing_repository import JobTimingRepository
+from ..repositories.processing_repository import JobLeaseLost, ProcessingRepository
 from ..repositories.session_repository import SessionRepository
 from ..repositories.video_repository import VideoRepository
+from .result_cache_service import ResultCacheService
+from .time_estimator import TimeEstimator
 
 
 class ProcessingService:
     """Handles video processing using frame_picker core logic"""
 
-    def __init__(self, db: DBSession):
+    def __init__(self, db: DBSession, worker_id: Optional[str] = None):
         self.db = db
+        # Worker running jobs through this service; their status and results
+        # are only written while the job is still running under it
+        self.worker_id = worker_id
         self.session_repo = SessionRepository(db)
         self.video_repo = VideoRepository(db)
         self.processing_repo = ProcessingRepository(db)
+        self.result_cache = ResultCacheService(db)
+        self.timing_repo = JobTimingRepository(db)
+        self.estimator = TimeEstimator(db)
+
+    async def check_capacity(
+        self, session_id: str, request: ProcessRequest
+    ) -> Dict[str, Any]:
+        """
+        Check whether the queue can take a job without missing its deadline
+
+        The work ahead of the job is the estimated time of pending jobs of
+        the same or higher priority plus what is left of running jobs,
+        shared by QUEUE_WORKER_SLOTS. Jobs are turned away while
+        QUEUE_MAX_PENDING_JOBS are pending or when they would wait longer
+        than QUEUE_MAX_WAIT_SECONDS. Jobs served from the result cache are
+        always accepted.
+
+        Returns:
+            can_process, estimated_time (wait plus processing, in seconds)
+            and retry_after (seconds until the backlog is expected to drain)
+        """
+        session, video_file = self._get_session_video(session_id)
+
+        if settings.RESULT_CACHE_ENABLED and self.result_cache.contains(
+            video_file.content_hash, request
+        ):
+            return {"can_process": True, "estimated_time": 0, "retry_after": 0}
+
+        estimate = await self.get_processing_estimate(
+            self._file_info(video_file), request
+        )
+        _, priority = self._get_tier_priority(session)
+        backlog = self.processing_repo.get_backlog(priority)
+
+        slots = max(1, settings.QUEUE_WORKER_SLOTS)
+        wait = int((backlog["pending_seconds"] + backlog["running_seconds"]) / slots)
+        excess = wait - settings.QUEUE_MAX_WAIT_SECONDS
+
+        if backlog["pending_jobs"] < settings.QUEUE_MAX_PENDING_JOBS and excess <= 0:
+            return {
+                "can_process": True,
+                "estimated_time": wait + estimate,
+                "retry_after": 0,
+            }
 
-    async def create_processing_job(self, session_id: str, request: ProcessRequest):
-        """Create a new processing job in database"""
-        # Get session
-        session = self.session_repo.get_by_session_id(session_id)
-        if not session:
-            raise ValueError("Session not found")
+        # Until the wait is back within the limit, and at least until one
+        # queued job's worth of work has cleared
+        drain = backlog["pending_seconds"] / max(1, backlog["pending_jobs"]) / slots
+        return {
+            "can_process": False,
+            "estimated_time": wait + estimate,
+            "retry_after": max(1, excess, int(drain)),
+        }
 
-        # Get video file for this session
-        video_files = self.video_repo.get_by_session_id(session.id)
-        if not video_files:
-            raise ValueError("No video file found for session")
-
-        video_file = video_files[0]  # Take the first (and should be only) video file
+    async def create_processing_job(self, session_id: str, request: ProcessRequest):
+        """
+        Create a new processing job in database
+
+        If the same video content was already processed with the same
+        parameters, the job is completed right away from the result cache;
+        otherwise it is queued as "pending" for a worker to run
+        process_video_background, and the session is marked "processing".
+        """
+        session, video_file = self._get_session_video(session_id)
+        tier, priority = self._get_tier_priority(session)
+
+        cached = settings.RESULT_CACHE_ENABLED and self.result_cache.contains(
+            video_file.content_hash, request
+        )
+        if not cached:
+            self._mark_session_processing(session)
 
-        # Create processing job
+        # Create processing job; a cached one is not claimable while restored
         job = self.processing_repo.create_processing_job(
             session_id=session.id,
             video_file_id=video_file.id,
             params=request.model_dump(),
+            tier=tier,
+            priority=priority,
+            owner_key=str(session.user_id or session.session_id),
+            estimated_time=await self.get_processing_estimate(
+                self._file_info(video_file), request
+            ),
+            status="running" if cached else "pending",
         )
 
+        if cached and not self.result_cache.restore(job, request):
+            # The cache entry is gone after all; queue the job instead
+            self._mark_session_processing(session)
+            self.processing_repo.update_job_status(job, "pending")
+
         return job
 
     async def process_video_background(self, job_id: str, request: ProcessRequest):
-        """Background task for video processing"""
+        """
+        Process a job; runs in a JobExecutor worker process
+
+        The job is abandoned as soon as a write finds it is no longer running
+        under ``worker_id`` (see ``ProcessingRepository.update_job_status``).
+        """
         try:
             # Get processing job
             job = self.processing_repo.get_by_id(job_id)
@@ -70,7 +167,9 @@ class ProcessingService:
                 raise ValueError("Processing job not found")
 
             # Update job status
-            self.processing_repo.update_job_status(job, "running", progress=10)
+            self.processing_repo.update_job_status(
+                job, "running", progress=10, worker_id=self.worker_id
+            )
 
             # Update session status
             await self._update_session_status(
@@ -83,7 +182,15 @@ class ProcessingService:
                 results = await self._mock_processing(job, request)
 
             # Update job as completed
-            self.processing_repo.update_job_status(job, "completed", progress=100)
+            self.processing_repo.update_job_status(
+                job, "completed", progress=100, worker_id=self.worker_id
+            )
+
+            if FRAME_PICKER_AVAILABLE and settings.RESULT_CACHE_ENABLED:
+                try:
+                    self.result_cache.store(job, request)
+                except Exception as e:
+                    print(f"Could not cache results of job {job_id}: {e}")
 
             # Update session with results
             await self._update_session_status(
@@ -93,10 +200,22 @@ class ProcessingService:
                 100,
             )
 
+        except JobLeaseLost as e:
+            # Requeued after missing heartbeats; the job belongs to whoever
+            # claims it next, so leave its records alone
+            print(f"Abandoned job {job_id}: {e}")
+
         except Exception as e:
             # Update job as failed
             if "job" in locals():
-                self.processing_repo.update_job_status(job, "failed", error=str(e))
+                try:
+                    self.processing_repo.update_job_status(
+                        job, "failed", error=str(e), worker_id=self.worker_id
+                    )
+                except JobLeaseLost as lost:
+                    print(f"Abandoned job {job_id}: {lost}")
+                    return
+                self.processing_repo.record_failure(job, str(e))
 
                 # Update session with error
                 await self._update_session_status(
@@ -152,6 +271,23 @@ class ProcessingService:
         results.sort(key=lambda x: x.frame_index)
         return results
 
+    async def get_queue_metrics(self) -> List[QueueMetrics]:
+        """Queue length and wait times of each tier"""
+        rows = self.processing_repo.get_queue_metrics(
+            timedelta(minutes=settings.QUEUE_METRICS_WINDOW_MINUTES)
+        )
+        return [
+            QueueMetrics(
+                tier=row["tier"],
+                pending_jobs=row["pending_jobs"],
+                running_jobs=row["running_jobs"],
+                oldest_pending_wait=row["oldest_pending_wait"],
+                average_wait=row["average_wait"],
+                p95_wait=row["p95_wait"],
+            )
+            for row in rows
+        ]
+
     async def get_frame_file_path(self, session_id: str, frame_index: int) -> str:
         """Get file path for a specific frame"""
         session = self.session_repo.get_by_session_id(session_id)
@@ -167,6 +303,56 @@ class ProcessingService:
 
         raise ValueError("Frame not found")
 
+    def _get_session_video(self, session_id: str):
+        """Session and its uploaded video file"""
+        session = self.session_repo.get_by_session_id(session_id)
+        if not session:
+            raise ValueError("Session not found")
+
+        # Get video file for this session
+        video_files = self.video_repo.get_by_session_id(session.id)
+        if not video_files:
+            raise ValueError("No video file found for session")
+
+        # Take the first (and should be only) video file
+        return session, video_files[0]
+
+    def _mark_session_processing(self, session) -> None:
+        """
+        Mark a session "processing" with the next commit
+
+        Made before queueing its job, so the session is committed together
+        with the job and a worker never claims a job of an "uploaded" session.
+        """
+        session.status = "processing"
+        session.message = "Video processing started"
+
+    def _get_tier_priority(self, session):
+        """Tier and queue priority of a session's jobs"""
+        # Anonymous users are on the free tier
+        tier = session.user.tier if session.user else TierEnum.free.value
+        priority = (
+            ProcessingRepository.PRIORITY_HIGH
+            if settings.get_tier_limits(tier)["priority_processing"]
+            else ProcessingRepository.PRIORITY_NORMAL
+        )
+        return tier, priority
+
+    def _file_info(self, video_file) -> Dict[str, Any]:
+        """Known metadata of a video file, for get_processing_estimate"""
+        return {
+            key: value
+            for key, value in (
+                ("duration", video_file.duration),
+                ("frame_count", video_file.frame_count),
+                ("fps", video_file.fps),
+                ("width", video_file.width),
+                ("height", video_file.height),
+                ("codec", video_file.codec),
+            )
+            if value is not None
+        }
+
     async def _update_session_status(
         self,
         session_id: str,
@@ -188,6 +374,7 @@ class ProcessingService:
         self, job, request: ProcessRequest
     ) -> List[FrameResult]:
         """Process video using the actual frame_picker core logic"""
+        started = time.perf_counter()
         video_file = job.video_file
         video_path = Path(video_file.file_path)
 
@@ -196,60 +383,223 @@ class ProcessingService:
         results_dir.mkdir(exist_ok=True)
 
         # Update progress
-        self.processing_repo.update_job_status(job, "running", progress=20)
+        self.processing_repo.update_job_status(
+            job, "running", progress=20, worker_id=self.worker_id
+        )
         await self._update_session_status(
-            job.session.session_id, "processing", "Extracting frames from video...", 20
+            job.session.session_id,
+            "processing",
+            "Extracting and analyzing frames...",
+            20,
         )
 
         # Initialize frame picker components
-        extractor = FrameExtractor(sample_rate=request.sample_rate)
+        extractor = FrameExtractor(
+            sample_rate=request.sample_rate,
+            sampling=request.sampling.value,
+            workers=settings.SEGMENT_WORKERS,
+            proxy_height=settings.PROXY_HEIGHT,
+            proxy_cache=(
+                ProxyCache(settings.PROXY_CACHE_MAX_BYTES, root=settings.UPLOAD_DIR)
+                if settings.PROXY_CACHE_ENABLED
+                else None
+            ),
+        )
         selector = FrameSelector(mode=request.mode.value, quality=request.quality.value)
 
-        # Extract frames
-        frames = extractor.extract_frames(video_path)
+        if settings.STORE_SCORES:
+            # Score every sample and keep the scores for re-ranking
+            scored = extractor.extract_scores(video_path, selector)
+            scored.save(
+                score_file_path(video_path),
+                metadata={
+                    "mode": selector.mode,
+                    "quality": selector.quality,
+                    "sampling": extractor.sampling,
+                    "sample_rate": extractor.sample_rate,
+                },
+            )
+
+            # Select best frames
+            positions = scored.select(request.count, request.min_interval)
+            best_frames = scored[positions].to_candidates()
+        else:
+            # Extract and score frames, one streaming pass per video segment
+            candidates = extractor.extract_candidates(
+                video_path,
+                selector,
+                count=request.count,
+                min_interval=request.min_interval,
+            )
+
+            # Select best frames
+            best_frames = selector.select_best_candidates(
+                candidates, count=request.count, min_interval=request.min_interval
+            )
 
-        if not frames:
+        if not selector.frames_analyzed:
             raise Exception("No frames could be extracted from the video")
 
+        if not best_frames:
+            raise Exception("Could not select suitable frames")
+
+        # Decode the selected frames at full resolution
+        decode_started = time.perf_counter()
+        best_frames = extractor.decode_selected(video_path, best_frames)
+        decoding_time = selector.decoding_time + time.perf_counter() - decode_started
+
         # Update progress
-        self.processing_repo.update_job_status(job, "running", progress=50)
+        self.processing_repo.update_job_status(
+            job, "running", progress=80, worker_id=self.worker_id
+        )
         await self._update_session_status(
-            job.session.session_id,
-            "processing",
-            f"Analyzing {len(frames)} frames...",
-            50,
+            job.session.session_id, "processing", "Saving selected frames...", 80
         )
 
-        # Select best frames
-        best_frames = selector.select_best_frames(
-            frames, count=request.count, min_interval=request.min_interval
+        timings = {"encode": 0.0, "save": 0.0}
+        results = self._save_frame_results(job, best_frames, results_dir, timings)
+
+        # Record how long each stage took, for estimating later jobs
+        self.timing_repo.create(
+            processing_job_id=job.id,
+            mode=request.mode.value,
+            quality=request.quality.value,
+            sampling=request.sampling.value,
+            sample_rate=request.sample_rate,
+            count=request.count,
+            width=video_file.width,
+            height=video_file.height,
+            fps=video_file.fps,
+            frame_count=video_file.frame_count,
+            duration=video_file.duration,
+            codec=video_file.codec,
+            frames_analyzed=selector.frames_analyzed,
+            decode_seconds=decoding_time,
+            score_seconds=selector.scoring_time,
+            encode_seconds=timings["encode"],
+            save_seconds=timings["save"],
+            total_seconds=time.perf_counter() - started,
         )
 
+        return results
+
+    async def rerank(
+        self, session_id: str, request: RerankRequest
+    ) -> List[FrameResult]:
+        """
+        Select frames again from the scores stored by the last completed job
+
+        Only the selected frames are decoded; the results are stored as a
+        new completed job, which becomes the one get_results returns.
+        """
+        if not FRAME_PICKER_AVAILABLE:
+            raise ValueError("Re-ranking requires frame_picker core")
+
+        session = self.session_repo.get_by_session_id(session_id)
+        if not session:
+            raise ValueError("Session not found")
+
+        previous_job = next(
+            (
+                job
+                for job in self.processing_repo.get_by_session_id(session.id)
+                if job.status == "completed"
+            ),
+            None,
+        )
+        if not previous_job:
+            raise ValueError("Processing not completed yet")
+
+        video_path = Path(previous_job.video_file.file_path)
+        scores_path = score_file_path(video_path)
+        if not scores_path.exists():
+            raise ValueError("No stored scores for this session, process it again")
+
+        scored, metadata = ScoredFrames.load(scores_path)
+        selector = FrameSelector(
+            mode=metadata["mode"], quality=metadata["quality"], weights=request.weights
+        )
+
+        scored = selector.rescore(scored)
+        positions = scored.select(request.count, request.min_interval)
+        best_frames = scored[positions].to_candidates()
         if not best_frames:
-            raise Exception("Could not select suitable frames")
+            raise ValueError("Could not select suitable frames")
 
-        # Update progress
-        self.processing_repo.update_job_status(job, "running", progress=80)
-        await self._update_session_status(
-            job.session.session_id, "processing", "Saving selected frames...", 80
+        tier, priority = self._get_tier_priority(session)
+        job = self.processing_repo.create_processing_job(
+            session_id=session.id,
+            video_file_id=previous_job.video_file_id,
+            params={
+                "mode": metadata["mode"],
+                "quality": metadata["quality"],
+                "count": request.count,
+                "sampling": metadata["sampling"],
+                "sample_rate": metadata["sample_rate"],
+                "min_interval": request.min_interval,
+            },
+            tier=tier,
+            priority=priority,
+            owner_key=str(session.user_id or session.session_id),
+            # Completed here rather than by a worker
+            status="running",
         )
 
-        # Save frames and create results
+        try:
+            # Decoding and encoding block for a while; keep them off the event loop
+            best_frames = await asyncio.to_thread(
+                FrameExtractor().decode_selected, video_path, best_frames
+            )
+
+            results_dir = settings.RESULTS_DIR / session_id
+            results_dir.mkdir(exist_ok=True)
+            results = await asyncio.to_thread(
+                self._save_frame_results, job, best_frames, results_dir
+            )
+        except Exception as e:
+            self.processing_repo.update_job_status(job, "failed", error=str(e))
+            raise
+
+        self.processing_repo.update_job_status(job, "completed", progress=100)
+        return results
+
+    def _save_frame_results(
+        self,
+        job,
+        best_frames: List[Dict],
+        results_dir: Path,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> List[FrameResult]:
+        """
+        Save selected frames as images and record them as job results
+
+        Seconds spent encoding and saving are added to the "encode" and
+        "save" entries of timings, when given.
+        """
+        records = ScoredFrames.from_candidates(best_frames).to_records()
         results = []
-        for i, frame_data in enumerate(best_frames):
+        for i, (frame_data, record) in enumerate(zip(best_frames, records)):
+            encode_started = time.perf_counter()
+
             # Apply tier restrictions
             processed_image = self._apply_tier_restrictions(
                 frame_data["frame"].image,
                 "free",  # TODO: Get user tier from session/auth
             )
 
-            # Save frame
+            # Encode with appropriate quality
+            quality = 85 if "free" == "free" else 95
+            buffer = io.BytesIO()
+            processed_image.save(buffer, "JPEG", quality=quality)
+
+            save_started = time.perf_counter()
+
+            # Save frame. Replace rather than overwrite the file, which may be
+            # hard-linked into the result cache.
             filename = f"frame_{i+1:02d}.jpg"
             file_path = results_dir / filename
-
-            # Save with appropriate quality
-            quality = 85 if "free" == "free" else 95
-            processed_image.save(str(file_path), "JPEG", quality=quality)
+            file_path.unlink(missing_ok=True)
+            file_path.write_bytes(buffer.getvalue())
 
             # Get file size
             file_size = file_path.stat().st_size
@@ -257,21 +607,27 @@ class ProcessingService:
             # Create frame result in database
             frame_result_data = {
                 "frame_index": i,
-                "score": float(frame_data["score"]),  # Konwersja np.float64 -> float
-                "timestamp": float(frame_data["timestamp"]),  # Bezpieczna konwersja
+                "score": record["score"],
+                "timestamp": record["timestamp"],
                 "file_path": str(file_path),
                 "file_size": file_size,
                 "width": processed_image.width,
                 "height": processed_image.height,
             }
 
-            self.processing_repo.add_frame_result(job.id, frame_result_data)
+            self.processing_repo.add_frame_result(
+                job.id, frame_result_data, worker_id=self.worker_id
+            )
+
+            if timings is not None:
+                timings["encode"] += save_started - encode_started
+                timings["save"] += time.perf_counter() - save_started
 
             # Create result for return
             result = FrameResult(
                 frame_index=i,
-                score=frame_data["score"],
-                timestamp=frame_data["timestamp"],
+                score=record["score"],
+                timestamp=record["timestamp"],
                 file_path=str(file_path),
                 download_url=f"/api/sessions/{job.session.session_id}/download/{i}",
                 width=processed_image.width,
@@ -296,7 +652,9 @@ class ProcessingService:
         await asyncio.sleep(2)
 
         # Update progress
-        self.processing_repo.update_job_status(job, "running", progress=50)
+        self.processing_repo.update_job_status(
+            job, "running", progress=50, worker_id=self.worker_id
+        )
         await self._update_session_status(
             job.session.session_id,
             "processing",
@@ -355,7 +713,9 @@ class ProcessingService:
                 "height": img.height,
             }
 
-            self.processing_repo.add_frame_result(job.id, frame_result_data)
+            self.processing_repo.add_frame_result(
+                job.id, frame_result_data, worker_id=self.worker_id
+            )
 
             # Create result for return
             result = FrameResult(
@@ -451,9 +811,18 @@ class ProcessingService:
     async def get_processing_estimate(
         self, file_info: Dict[str, Any], request: ProcessRequest
     ) -> int:
-        """Estimate processing time in seconds"""
+        """
+        Estimate processing time in seconds
+
+        Predicted from the timings of completed jobs (see TimeEstimator);
+        until enough have been recorded, a rough guess from the duration.
+        """
+        predicted = self.estimator.predict(file_info, request.model_dump(mode="json"))
+        if predicted is not None:
+            return math.ceil(predicted)
+
         # Base time estimation
-        duration = file_info.get("duration", 30)
+        duration = file_info.get("duration") or 30
         frame_count = file_info.get("frame_count", 900)
 
         # Estimate based on video length and quality
@@ -0,0 +1,198 @@
+"""
+Cache of processing results keyed by video content and parameters
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as DBSession
+
+try:
+    from frame_picker.core import ALGORITHM_VERSION
+except ImportError:  # results are not cached without frame_picker core
+    ALGORITHM_VERSION = None
+
+from ..config import settings
+from ..models import ProcessRequest
+from ..repositories.processing_repository import ProcessingRepository
+from ..repositories.result_cache_repository import ResultCacheRepository
+
+
+class ResultCacheService:
+    """Reuses the results of earlier jobs for identical uploads
+
+    Results are keyed by the SHA-256 of the uploaded file together with
+    every parameter and setting that affects the selection and the
+    algorithm version (see ``version``), so the same clip uploaded again,
+    by anyone, completes without being analyzed. Cached frames are kept
+    under CACHE_DIR and hard-linked into session results; the least
+    recently used entries are evicted once they exceed
+    RESULT_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self, db: DBSession):
+        self.db = db
+        self.cache_repo = ResultCacheRepository(db)
+        self.processing_repo = ProcessingRepository(db)
+        self.cache_dir = settings.CACHE_DIR
+
+    @property
+    def version(self) -> str:
+        """Algorithm version and the analysis settings that can alter results"""
+        return (
+            f"{ALGORITHM_VERSION}:proxy={settings.PROXY_HEIGHT}"
+            f":scores={int(settings.STORE_SCORES)}"
+        )
+
+    def cache_key(self, content_hash: str, request: ProcessRequest) -> str:
+        """Key of the results of processing the given content with request"""
+        fields = [
+            content_hash,
+            request.mode.value,
+            request.quality.value,
+            request.sampling.value,
+            request.sample_rate,
+            request.count,
+            request.min_interval,
+            self.version,
+        ]
+        return hashlib.sha256("|".join(map(str, fields)).encode()).hexdigest()
+
+    def contains(self, content_hash: Optional[str], request: ProcessRequest) -> bool:
+        """Whether results for the content and request are cached"""
+        if not content_hash or ALGORITHM_VERSION is None:
+            return False
+        cache_key = self.cache_key(content_hash, request)
+        return self.cache_repo.get_by_key(cache_key) is not None
+
+    def restore(self, job, request: ProcessRequest) -> bool:
+        """
+        Complete a job from the cache
+
+        Returns:
+            True if cached results were found and the job is completed
+        """
+        content_hash = job.video_file.content_hash
+        if not content_hash or ALGORITHM_VERSION is None:
+            return False
+
+        entry = self.cache_repo.get_by_key(self.cache_key(content_hash, request))
+        if not entry:
+            return False
+
+        directory = Path(entry.directory)
+        if not all((directory / frame["filename"]).exists() for frame in entry.frames):
+            # Files removed behind our back; drop the entry
+            self._delete_entry(entry)
+            return False
+
+        results_dir = settings.RESULTS_DIR / job.session.session_id
+        results_dir.mkdir(exist_ok=True)
+
+        for frame in entry.frames:
+            file_path = results_dir / frame["filename"]
+            self._link_or_copy(directory / frame["filename"], file_path)
+
+            self.processing_repo.add_frame_result(
+                job.id,
+                {
+                    "frame_index": frame["frame_index"],
+                    "score": frame["score"],
+                    "timestamp": frame["timestamp"],
+                    "file_path": str(file_path),
+                    "file_size": frame["file_size"],
+                    "width": frame["width"],
+                    "height": frame["height"],
+                },
+            )
+
+        self.cache_repo.mark_used(entry)
+        self.processing_repo.update_job_status(job, "completed", progress=100)
+        return True
+
+    def store(self, job, request: ProcessRequest) -> None:
+        """Add the results of a completed job to the cache"""
+        content_hash = job.video_file.content_hash
+        if not content_hash or ALGORITHM_VERSION is None or not job.frame_results:
+            return
+
+        cache_key = self.cache_key(content_hash, request)
+        if self.cache_repo.get_by_key(cache_key):
+            return
+
+        directory = self.cache_dir / str(uuid.uuid4())
+        directory.mkdir(parents=True)
+
+        frames = []
+        for frame_result in job.frame_results:
+            source = Path(frame_result.file_path)
+            self._link_or_copy(source, directory / source.name)
+            frames.append(
+                {
+                    "filename": source.name,
+                    "frame_index": frame_result.frame_index,
+                    "score": frame_result.score,
+                    "timestamp": frame_result.timestamp,
+                    "file_size": frame_result.file_size,
+                    "width": frame_result.width,
+                    "height": frame_result.height,
+                }
+            )
+
+        try:
+            self.cache_repo.create(
+                cache_key=cache_key,
+                content_hash=content_hash,
+                mode=request.mode.value,
+                quality=request.quality.value,
+                sampling=request.sampling.value,
+                sample_rate=request.sample_rate,
+                count=request.count,
+                min_interval=request.min_interval,
+                algorithm_version=self.version,
+                directory=str(directory),
+                frames=frames,
+                size_bytes=sum(frame["file_size"] or 0 for frame in frames),
+            )
+        except IntegrityError:
+            # Another job cached the same results first
+            self.db.rollback()
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self, max_bytes: Optional[int] = None) -> None:
+        """Delete least recently used entries until the cache fits max_bytes"""
+        if max_bytes is None:
+            max_bytes = settings.RESULT_CACHE_MAX_BYTES
+
+        total = self.cache_repo.total_size()
+        while total > max_bytes:
+            entries = self.cache_repo.get_least_recently_used()
+            if not entries:
+                break
+
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                total -= entry.size_bytes
+                self._delete_entry(entry)
+
+    def _delete_entry(self, entry) -> None:
+        """Delete a cache entry and its files"""
+        shutil.rmtree(entry.directory, ignore_errors=True)
+        self.cache_repo.delete(entry)
+
+    def _link_or_copy(self, source: Path, target: Path) -> None:
+        """Hard-link source to target, copying where links are unsupported"""
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
@@ -0,0 +1,145 @@
+"""
+Processing time estimates learned from the timings of completed jobs
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session as DBSession
+
+from ..config import settings
+from ..repositories.job_timing_repository import JobTimingRepository
+
+# Codecs markedly slower to decode than H.264 per pixel
+SLOW_CODECS = ("hevc", "hev1", "hvc1", "h265", "av01", "av1")
+
+# Assumed for videos whose metadata could not be read
+DEFAULT_FPS = 30.0
+DEFAULT_MEGAPIXELS = 1280 * 720 / 1e6
+
+
+class TimeEstimator:
+    """Predicts how long a job takes from the timings of completed jobs
+
+    A ridge regression of total job time on the features of the video and
+    request (see ``features``) is fitted to the last ESTIMATOR_HISTORY
+    recorded jobs. The fit is shared by all estimators of the process and
+    redone every ESTIMATOR_REFIT_SECONDS; ``predict`` returns None until
+    ESTIMATOR_MIN_SAMPLES jobs have been recorded.
+    """
+
+    # Penalty relative to each feature's scale, keeping the fit stable with
+    # few or nearly collinear samples
+    RIDGE = 1e-3
+
+    # Fitted weights shared across instances, and when they were fitted
+    _weights: Optional[np.ndarray] = None
+    _fitted_at: Optional[float] = None
+
+    def __init__(self, db: DBSession):
+        self.db = db
+        self.timing_repo = JobTimingRepository(db)
+
+    @staticmethod
+    def features(file_info: Dict[str, Any], params: Dict[str, Any]) -> np.ndarray:
+        """
+        Regression features of a job
+
+        Decoding cost grows with the frames decoded times their size,
+        scoring with the samples (at proxy resolution) and more so for the
+        costlier quality presets and modes, and saving with the frames
+        selected times their size.
+        """
+        fps = file_info.get("fps") or DEFAULT_FPS
+        frame_count = file_info.get("frame_count") or 0
+        duration = file_info.get("duration") or frame_count / fps
+        if not frame_count:
+            frame_count = duration * fps
+
+        width, height = file_info.get("width"), file_info.get("height")
+        megapixels = width * height / 1e6 if width and height else DEFAULT_MEGAPIXELS
+
+        sample_rate = params["sample_rate"]
+        sampling = params["sampling"]
+        if sampling == "frames":
+            samples = frame_count / sample_rate
+        elif sampling == "fps":
+            samples = duration * sample_rate
+        else:
+            samples = min(sample_rate, frame_count)
+
+        slow_codec = (file_info.get("codec") or "").lower() in SLOW_CODECS
+        decoded = frame_count * megapixels
+
+        return np.array(
+            [
+                1.0,
+                samples,
+                samples * megapixels,
+                decoded,
+                decoded if slow_codec else 0.0,
+                samples if params["quality"] == "best" else 0.0,
+                samples if params["quality"] == "fast" else 0.0,
+                samples if params["mode"] == "action" else 0.0,
+                params["count"] * megapixels,
+            ]
+        )
+
+    def predict(
+        self, file_info: Dict[str, Any], params: Dict[str, Any]
+    ) -> Optional[float]:
+        """Predicted seconds to process a job, or None without enough history"""
+        weights = self._current_weights()
+        if weights is None:
+            return None
+        return max(1.0, float(self.features(file_info, params) @ weights))
+
+    def fit(self) -> Optional[np.ndarray]:
+        """Fit the regression to the recorded timings"""
+        timings = self.timing_repo.get_recent(settings.ESTIMATOR_HISTORY)
+        if len(timings) < settings.ESTIMATOR_MIN_SAMPLES:
+            return None
+
+        X = np.array(
+            [
+                self.features(
+                    {
+                        "fps": timing.fps,
+                        "frame_count": timing.frame_count,
+                        "duration": timing.duration,
+                        "width": timing.width,
+                        "height": timing.height,
+                        "codec": timing.codec,
+                    },
+                    {
+                        "mode": timing.mode,
+                        "quality": timing.quality,
+                        "sampling": timing.sampling,
+                        "sample_rate": timing.sample_rate,
+                        "count": timing.count,
+                    },
+                )
+                for timing in timings
+            ]
+        )
+        y = np.array([timing.total_seconds for timing in timings])
+
+        # Features that are always 0 get a unit penalty instead, so the
+        # system stays solvable
+        gram = X.T @ X
+        penalty = np.diag(gram).copy()
+        penalty[penalty == 0] = 1.0
+        return np.linalg.solve(gram + self.RIDGE * np.diag(penalty), X.T @ y)
+
+    def _current_weights(self) -> Optional[np.ndarray]:
+        """Fitted weights, refitting them when they are due"""
+        now = time.monotonic()
+        cls = type(self)
+        if (
+            cls._fitted_at is None
+            or now - cls._fitted_at >= settings.ESTIMATOR_REFIT_SECONDS
+        ):
+            cls._weights = self.fit()
+            cls._fitted_at = now
+        return cls._weights
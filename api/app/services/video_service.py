@@ -2,6 +2,7 @@
 Video file handling service with database integration
 """
 
+import hashlib
 from pathlib import Path
 from typing import Any, Dict
 
@@ -58,6 +59,7 @@ class VideoService:
             "file_path": str(file_path),
             "file_size": len(content),
             "content_type": video.content_type,
+            "content_hash": hashlib.sha256(content).hexdigest(),
             **video_info,
         }
 
@@ -89,6 +91,7 @@ class VideoService:
             "height": None,
             "frame_count": None,
             "format": None,
+            "codec": None,
         }
 
         try:
@@ -100,6 +103,8 @@ class VideoService:
                 frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
                 width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                 height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+                codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4))
 
                 # Calculate duration
                 duration = frame_count / fps if fps > 0 else None
@@ -112,6 +117,7 @@ class VideoService:
                         "height": height,
                         "frame_count": frame_count,
                         "format": file_path.suffix.lower(),
+                        "codec": codec.strip("\x00 ").lower() or None,
                     }
                 )
 
@@ -0,0 +1,226 @@
+"""
+Frame Picker worker - runs queued processing jobs
+"""
+
+import os
+import signal
+import socket
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from .config import settings
+from .database.connection import SessionLocal
+from .models import ProcessRequest
+from .repositories.processing_repository import ProcessingRepository
+from .repositories.session_repository import SessionRepository
+from .services.job_executor import JobExecutor
+
+
+class Worker:
+    """Claims pending processing jobs from the database and runs them
+
+    The processing_jobs table is the queue: the API only inserts pending
+    jobs, and any number of workers, on any machine, claim them with
+    ``ProcessingRepository.claim_next_job``. A worker runs up to
+    ``executor.max_workers`` jobs at a time in its process pool and sends
+    heartbeats renewing their leases while they run. Jobs of workers that
+    died, whose leases expired, are requeued by whichever worker notices
+    first (see ``ProcessingRepository.requeue_expired_jobs``). Jobs running
+    for JOB_TIMEOUT_FACTOR times their estimated time (and at least
+    JOB_MIN_TIMEOUT_SECONDS) are requeued the same way by their own worker,
+    as their process may be stuck.
+    """
+
+    def __init__(self, executor: JobExecutor, worker_id: Optional[str] = None):
+        self.executor = executor
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.running: Dict[str, Future] = {}
+        # Monotonic time by which each running job must finish; jobs timed
+        # out are dropped, and no longer get heartbeats
+        self.deadlines: Dict[str, float] = {}
+        self._stopping = False
+        self._last_heartbeat = 0.0
+
+    def run(self) -> None:
+        """Process jobs until stopped, then wait for the running ones"""
+        print(f"Worker {self.worker_id} started with {self.executor.max_workers} slots")
+
+        # Database errors in a row; the loop backs off while they last
+        errors = 0
+
+        try:
+            while not self._stopping or self.running:
+                self._reap()
+
+                db = SessionLocal()
+                try:
+                    repo = ProcessingRepository(db)
+                    if self._heartbeat_due():
+                        self._time_out_jobs(repo, SessionRepository(db))
+                        self._renew_leases(repo)
+                        self._requeue_expired(repo, SessionRepository(db))
+                    if not self._stopping:
+                        self._claim_jobs(repo)
+                    errors = 0
+                except Exception as e:
+                    # E.g. a dropped connection; running jobs carry on meanwhile
+                    errors += 1
+                    print(f"Worker {self.worker_id} database error ({errors}): {e}")
+                    self._rollback(db)
+                    # Renew leases as soon as the database is back
+                    self._last_heartbeat = 0.0
+                finally:
+                    db.close()
+
+                time.sleep(self._poll_delay(errors))
+        finally:
+            self.executor.shutdown()
+
+        print(f"Worker {self.worker_id} stopped")
+
+    def stop(self, *args) -> None:
+        """Stop claiming jobs; run() returns once the running ones finish"""
+        self._stopping = True
+
+    def _poll_delay(self, errors: int) -> float:
+        """
+        Seconds to wait before polling again after errors database errors
+
+        Doubles with every error, up to a third of the lease period, so that
+        leases can still be renewed once the database is back.
+        """
+        if not errors:
+            return settings.WORKER_POLL_INTERVAL
+        longest = max(settings.WORKER_POLL_INTERVAL, settings.JOB_LEASE_SECONDS / 3)
+        return min(settings.WORKER_POLL_INTERVAL * 2**errors, longest)
+
+    def _rollback(self, db) -> None:
+        """Roll back a failed transaction, if the connection still allows it"""
+        try:
+            db.rollback()
+        except Exception as e:
+            print(f"Worker {self.worker_id} could not roll back: {e}")
+
+    def _claim_jobs(self, repo: ProcessingRepository) -> None:
+        """Claim pending jobs until the pool is full or the queue is empty"""
+        while len(self.running) < self.executor.max_workers:
+            job = repo.claim_next_job(
+                self.worker_id, settings.JOB_LEASE_SECONDS, settings.JOB_AGING_SECONDS
+            )
+            if job is None:
+                break
+
+            wait = (job.started_at - job.created_at).total_seconds()
+            print(f"Claimed job {job.id} ({job.tier}) after waiting {wait:.1f}s")
+
+            request = ProcessRequest(
+                mode=job.mode,
+                quality=job.quality,
+                count=job.count,
+                sampling=job.sampling,
+                sample_rate=job.sample_rate,
+                min_interval=job.min_interval,
+            )
+            self.running[str(job.id)] = self.executor.submit(
+                job.id, request, self.worker_id
+            )
+            self.deadlines[str(job.id)] = time.monotonic() + max(
+                settings.JOB_MIN_TIMEOUT_SECONDS,
+                settings.JOB_TIMEOUT_FACTOR * (job.estimated_time or 0),
+            )
+
+    def _heartbeat_due(self) -> bool:
+        """Whether to send heartbeats; done a few times per lease period"""
+        now = time.monotonic()
+        if now - self._last_heartbeat < settings.JOB_LEASE_SECONDS / 3:
+            return False
+        self._last_heartbeat = now
+        return True
+
+    def _time_out_jobs(
+        self, repo: ProcessingRepository, session_repo: SessionRepository
+    ) -> None:
+        """
+        Requeue running jobs past their deadline
+
+        Their process keeps its slot until it ends, if ever, but can no
+        longer write to the job.
+        """
+        now = time.monotonic()
+        for job_id, deadline in list(self.deadlines.items()):
+            if now < deadline:
+                continue
+
+            del self.deadlines[job_id]
+            job = repo.requeue_timed_out_job(
+                job_id,
+                self.worker_id,
+                "Job did not finish in time",
+                settings.JOB_MAX_ATTEMPTS,
+                settings.JOB_RETRY_BACKOFF_SECONDS,
+            )
+            if job is not None:
+                print(f"Job {job_id} timed out, job is now {job.status}")
+                self._report_requeued(job, session_repo)
+
+    def _renew_leases(self, repo: ProcessingRepository) -> None:
+        """Extend the leases of running jobs that have not timed out"""
+        for job_id in list(self.deadlines):
+            if not repo.renew_lease(job_id, self.worker_id, settings.JOB_LEASE_SECONDS):
+                print(f"Worker {self.worker_id} lost the lease of job {job_id}")
+
+    def _requeue_expired(
+        self, repo: ProcessingRepository, session_repo: SessionRepository
+    ) -> None:
+        """Requeue the jobs of dead workers and tell their sessions"""
+        jobs = repo.requeue_expired_jobs(
+            settings.JOB_MAX_ATTEMPTS, settings.JOB_RETRY_BACKOFF_SECONDS
+        )
+
+        for job in jobs:
+            print(f"Lease of job {job.id} expired, job is now {job.status}")
+            self._report_requeued(job, session_repo)
+
+    def _report_requeued(self, job, session_repo: SessionRepository) -> None:
+        """Tell the session of a requeued job whether it is retried or failed"""
+        if job.status == "failed":
+            update_data = {
+                "status": "failed",
+                "message": f"Processing failed: {job.error}",
+                "progress": 0,
+                "error": job.error,
+            }
+        else:
+            update_data = {
+                "message": f"Retrying processing (attempt {job.attempts + 1})...",
+                "progress": 0,
+            }
+        session_repo.update(job.session, **update_data)
+
+    def _reap(self) -> None:
+        """
+        Forget jobs whose worker process has finished
+
+        A job whose process died without reporting (e.g. killed for running
+        out of memory) stops getting heartbeats, so it is requeued once its
+        lease expires.
+        """
+        for job_id, future in list(self.running.items()):
+            if future.done():
+                del self.running[job_id]
+                self.deadlines.pop(job_id, None)
+
+
+def run_worker():
+    """Entry point for poetry script"""
+    worker = Worker(JobExecutor(settings.PROCESSING_WORKERS))
+
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    worker.run()
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,4 @@
+-- Rollback sampling mode
+
+ALTER TABLE processing_jobs
+    DROP COLUMN IF EXISTS sampling;
@@ -0,0 +1,4 @@
+-- Add sampling mode to processing jobs
+
+ALTER TABLE processing_jobs
+    ADD COLUMN sampling VARCHAR(50) NOT NULL DEFAULT 'frames';
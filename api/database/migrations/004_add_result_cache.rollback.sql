@@ -0,0 +1,9 @@
+-- Rollback result cache
+
+DROP INDEX IF EXISTS idx_result_cache_last_used_at;
+DROP INDEX IF EXISTS idx_result_cache_content_hash;
+DROP TABLE IF EXISTS result_cache;
+
+DROP INDEX IF EXISTS idx_video_files_content_hash;
+ALTER TABLE video_files
+    DROP COLUMN IF EXISTS content_hash;
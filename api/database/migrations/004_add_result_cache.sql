@@ -0,0 +1,30 @@
+-- Add content hashes of uploads and a cache of results keyed by them
+
+ALTER TABLE video_files
+    ADD COLUMN content_hash VARCHAR(64);
+
+CREATE INDEX idx_video_files_content_hash ON video_files(content_hash);
+
+-- Result cache table
+CREATE TABLE result_cache (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    cache_key VARCHAR(64) NOT NULL UNIQUE,
+    content_hash VARCHAR(64) NOT NULL,
+    mode VARCHAR(50) NOT NULL,
+    quality VARCHAR(50) NOT NULL,
+    sampling VARCHAR(50) NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    min_interval FLOAT NOT NULL,
+    algorithm_version VARCHAR(50) NOT NULL,
+    directory VARCHAR(500) NOT NULL,
+    frames JSONB NOT NULL,
+    size_bytes BIGINT NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes for performance
+CREATE INDEX idx_result_cache_content_hash ON result_cache(content_hash);
+CREATE INDEX idx_result_cache_last_used_at ON result_cache(last_used_at);
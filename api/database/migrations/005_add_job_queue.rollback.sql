@@ -0,0 +1,8 @@
+-- Rollback job queue
+
+DROP INDEX IF EXISTS idx_processing_jobs_pending;
+
+ALTER TABLE processing_jobs
+    DROP COLUMN IF EXISTS attempts,
+    DROP COLUMN IF EXISTS lease_expires_at,
+    DROP COLUMN IF EXISTS worker_id;
@@ -0,0 +1,10 @@
+-- Let workers claim processing jobs from the table under a lease
+
+ALTER TABLE processing_jobs
+    ADD COLUMN worker_id VARCHAR(255),
+    ADD COLUMN lease_expires_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0;
+
+-- Pending jobs are claimed oldest first
+CREATE INDEX idx_processing_jobs_pending ON processing_jobs(created_at)
+    WHERE status = 'pending';
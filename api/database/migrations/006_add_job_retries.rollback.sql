@@ -0,0 +1,10 @@
+-- Rollback job retries
+
+DROP INDEX IF EXISTS idx_job_failures_processing_job_id;
+DROP TABLE IF EXISTS job_failures;
+
+DROP INDEX IF EXISTS idx_processing_jobs_lease_expires_at;
+
+ALTER TABLE processing_jobs
+    DROP COLUMN IF EXISTS available_at,
+    DROP COLUMN IF EXISTS heartbeat_at;
@@ -0,0 +1,22 @@
+-- Heartbeats, retry backoff and failure history of processing jobs
+
+ALTER TABLE processing_jobs
+    ADD COLUMN heartbeat_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN available_at TIMESTAMP WITH TIME ZONE;
+
+-- Running jobs are checked for expired leases
+CREATE INDEX idx_processing_jobs_lease_expires_at
+    ON processing_jobs(lease_expires_at)
+    WHERE status = 'running';
+
+-- Failed attempts table
+CREATE TABLE job_failures (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    processing_job_id UUID NOT NULL REFERENCES processing_jobs(id) ON DELETE CASCADE,
+    attempt INTEGER NOT NULL,
+    worker_id VARCHAR(255),
+    error TEXT NOT NULL,
+    failed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_job_failures_processing_job_id ON job_failures(processing_job_id);
@@ -0,0 +1,9 @@
+-- Rollback job priority
+
+DROP INDEX IF EXISTS idx_processing_jobs_started_at;
+DROP INDEX IF EXISTS idx_processing_jobs_owner_key;
+
+ALTER TABLE processing_jobs
+    DROP COLUMN IF EXISTS owner_key,
+    DROP COLUMN IF EXISTS priority,
+    DROP COLUMN IF EXISTS tier;
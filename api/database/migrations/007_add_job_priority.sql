@@ -0,0 +1,16 @@
+-- Priority classes and owners of processing jobs, for fair scheduling
+
+ALTER TABLE processing_jobs
+    ADD COLUMN tier VARCHAR(50) NOT NULL DEFAULT 'FREE',
+    ADD COLUMN priority INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN owner_key VARCHAR(255);
+
+-- Jobs belong to their user, or to their session for anonymous users
+UPDATE processing_jobs
+SET owner_key = COALESCE(sessions.user_id::text, sessions.session_id)
+FROM sessions
+WHERE sessions.id = processing_jobs.session_id;
+
+CREATE INDEX idx_processing_jobs_owner_key ON processing_jobs(owner_key)
+    WHERE status IN ('pending', 'running');
+CREATE INDEX idx_processing_jobs_started_at ON processing_jobs(started_at);
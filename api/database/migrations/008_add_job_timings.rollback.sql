@@ -0,0 +1,7 @@
+-- Rollback job timings
+
+DROP INDEX IF EXISTS idx_job_timings_created_at;
+DROP TABLE IF EXISTS job_timings;
+
+ALTER TABLE video_files
+    DROP COLUMN IF EXISTS codec;
@@ -0,0 +1,37 @@
+-- Stage timings of completed jobs, for estimating processing time
+
+ALTER TABLE video_files
+    ADD COLUMN codec VARCHAR(16);
+
+-- Job timings table
+CREATE TABLE job_timings (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    processing_job_id UUID NOT NULL REFERENCES processing_jobs(id) ON DELETE CASCADE,
+
+    -- Request parameters
+    mode VARCHAR(50) NOT NULL,
+    quality VARCHAR(50) NOT NULL,
+    sampling VARCHAR(50) NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+
+    -- Video metadata
+    width INTEGER,
+    height INTEGER,
+    fps FLOAT,
+    frame_count INTEGER,
+    duration FLOAT,
+    codec VARCHAR(16),
+
+    -- Seconds per stage
+    frames_analyzed INTEGER NOT NULL,
+    decode_seconds FLOAT NOT NULL,
+    score_seconds FLOAT NOT NULL,
+    encode_seconds FLOAT NOT NULL,
+    save_seconds FLOAT NOT NULL,
+    total_seconds FLOAT NOT NULL,
+
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_job_timings_created_at ON job_timings(created_at);
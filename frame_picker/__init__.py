@@ -6,6 +6,19 @@ __version__ = "0.1.0"
 __author__ = "Karol Binkowski"
 
 from .cli import main
-from .core import FrameData, FrameExtractor, FrameSelector
+from .core import (
+    FrameData,
+    FrameExtractor,
+    FrameSelector,
+    ProxyCache,
+    ScoredFrames,
+)
 
-__all__ = ["FrameExtractor", "FrameSelector", "FrameData", "main"]
+__all__ = [
+    "FrameExtractor",
+    "FrameSelector",
+    "FrameData",
+    "ProxyCache",
+    "ScoredFrames",
+    "main",
+]
@@ -8,7 +8,15 @@ from pathlib import Path
 
 import click
 
-from .core import FrameExtractor, FrameSelector
+from .core import (
+    MOTION_SAMPLING_AVAILABLE,
+    MOTION_SAMPLING_INSTALL,
+    FrameExtractor,
+    FrameSelector,
+    ProxyCache,
+    ScoredFrames,
+    score_file_path,
+)
 
 
 @click.command()
@@ -29,9 +37,15 @@ from .core import FrameExtractor, FrameSelector
 @click.option(
     "--sample-rate",
     "-s",
-    type=int,
+    type=click.IntRange(min=1),
     default=30,
-    help="Extract every Nth frame for analysis (default: 30)",
+    help="Every Nth frame (frames), samples per second (fps) or total samples (budget, motion) (default: 30)",
+)
+@click.option(
+    "--sampling",
+    type=click.Choice(["frames", "fps", "budget", "motion"], case_sensitive=False),
+    default="frames",
+    help="How --sample-rate is applied: every Nth frame, N per second of video, N in total, or the N motion peaks found from codec motion vectors (requires PyAV)",
 )
 @click.option(
     "--quality",
@@ -54,42 +68,168 @@ from .core import FrameExtractor, FrameSelector
     default=2.0,
     help="Minimum time interval between selected frames in seconds (default: 2.0)",
 )
-def main(video_path, output, mode, sample_rate, quality, count, min_interval):
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes decoding separate segments of the video (default: 1)",
+)
+@click.option(
+    "--proxy-height",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Score frames downscaled to this height (e.g. 360), then decode only the selected frames at full resolution",
+)
+@click.option(
+    "--cache-proxies",
+    is_flag=True,
+    help="Keep the --proxy-height frames next to the video so later runs with the same sampling skip decoding",
+)
+@click.option(
+    "--weight",
+    "weights",
+    multiple=True,
+    metavar="METRIC=WEIGHT",
+    help="Override the weight of a metric in the total score, e.g. face=0.3 --weight sharpness=0.2 (repeatable; all weights must add up to at most 1)",
+)
+@click.option(
+    "--save-scores",
+    is_flag=True,
+    help="Score every sample and store the scores next to the video for --rerank",
+)
+@click.option(
+    "--rerank",
+    is_flag=True,
+    help="Select from the scores stored by --save-scores instead of analyzing the video",
+)
+def main(
+    video_path,
+    output,
+    mode,
+    sample_rate,
+    sampling,
+    quality,
+    count,
+    min_interval,
+    workers,
+    proxy_height,
+    cache_proxies,
+    weights,
+    save_scores,
+    rerank,
+):
     """
     Extract the best frame(s) from a video for profile pictures or action shots.
 
     VIDEO_PATH: Path to the input video file
     """
+    if sampling.lower() == "motion" and not MOTION_SAMPLING_AVAILABLE:
+        raise click.BadParameter(
+            f"motion sampling requires PyAV, install it with {MOTION_SAMPLING_INSTALL}",
+            param_hint="--sampling",
+        )
+
     click.echo(f"🎬 Processing video: {video_path}")
     click.echo(f"📊 Mode: {mode.upper()}")
     click.echo(f"⚡ Quality: {quality}")
     click.echo(f"🔢 Extracting top {count} frame{'s' if count > 1 else ''}")
 
     try:
+        metric_weights = {}
+        for weight in weights:
+            name, _, value = weight.partition("=")
+            try:
+                metric_weights[name.strip().lower()] = float(value)
+            except ValueError:
+                raise click.BadParameter(
+                    f"expected METRIC=WEIGHT, got {weight}", param_hint="--weight"
+                )
+
         # Initialize components
-        extractor = FrameExtractor(sample_rate=sample_rate)
-        selector = FrameSelector(mode=mode, quality=quality)
+        extractor = FrameExtractor(
+            sample_rate=sample_rate,
+            sampling=sampling,
+            workers=workers,
+            proxy_height=proxy_height,
+            proxy_cache=ProxyCache() if cache_proxies else None,
+        )
+        scores_path = score_file_path(video_path)
+
+        if rerank:
+            if not scores_path.exists():
+                click.echo(
+                    f"❌ No stored scores at {scores_path}, run with --save-scores first",
+                    err=True,
+                )
+                return
+
+            scored, metadata = ScoredFrames.load(scores_path)
+            if metadata.get("mode") != mode.lower():
+                click.echo(
+                    f"❌ Stored scores are for {metadata.get('mode')} mode, not {mode}",
+                    err=True,
+                )
+                return
+
+            # Select from the stored scores; only the winners are decoded
+            click.echo(f"♻️  Re-ranking stored scores: {scores_path}")
+            selector = FrameSelector(
+                mode=mode,
+                quality=metadata.get("quality", quality),
+                weights=metric_weights,
+            )
+            scored = selector.rescore(scored)
+            best_frames = scored[scored.select(count, min_interval)].to_candidates()
+            frames_analyzed = len(scored)
+
+        elif save_scores:
+            selector = FrameSelector(mode=mode, quality=quality, weights=metric_weights)
+
+            # Score every sample so the scores can be re-ranked later
+            click.echo("🔍 Extracting and scoring all frames...")
+            scored = extractor.extract_scores(video_path, selector)
+            scored.save(
+                scores_path,
+                metadata={
+                    "mode": selector.mode,
+                    "quality": selector.quality,
+                    "sampling": extractor.sampling,
+                    "sample_rate": extractor.sample_rate,
+                },
+            )
+            click.echo(f"💾 Scores saved: {scores_path}")
 
-        # Extract frames from video
-        click.echo("🔍 Extracting frames...")
-        frames = extractor.extract_frames(video_path)
+            best_frames = scored[scored.select(count, min_interval)].to_candidates()
+            frames_analyzed = selector.frames_analyzed
 
-        if not frames:
+        else:
+            selector = FrameSelector(mode=mode, quality=quality, weights=metric_weights)
+
+            # Extract and analyze frames in a single streaming pass per segment
+            click.echo("🔍 Extracting and analyzing frames...")
+            candidates = extractor.extract_candidates(
+                video_path, selector, count=count, min_interval=min_interval
+            )
+
+            best_frames = selector.select_best_candidates(
+                candidates, count=count, min_interval=min_interval
+            )
+            frames_analyzed = selector.frames_analyzed
+
+        if not frames_analyzed:
             click.echo("❌ No frames could be extracted from the video", err=True)
             return
 
-        click.echo(f"✅ Extracted {len(frames)} frames for analysis")
-
-        # Select best frames
-        click.echo("🤖 Analyzing frames...")
-        best_frames = selector.select_best_frames(
-            frames, count=count, min_interval=min_interval
-        )
+        click.echo(f"✅ Analyzed {frames_analyzed} frames")
 
         if not best_frames:
             click.echo("❌ Could not select suitable frames", err=True)
             return
 
+        # Decode the selected frames at full resolution if scored on proxies
+        best_frames = extractor.decode_selected(video_path, best_frames)
+
         click.echo(
             f"🎯 Selected {len(best_frames)} best frame{'s' if len(best_frames) > 1 else ''}"
         )
@@ -2,41 +2,803 @@
 Core functionality for frame extraction and selection
 """
 
+import bisect
+import heapq
+import itertools
+import json
 import math
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 from PIL import Image
 
+try:
+    import av
+except ImportError:  # PyAV is only needed for motion vector sampling
+    av = None
+
+MOTION_SAMPLING_AVAILABLE = av is not None
+MOTION_SAMPLING_INSTALL = "pip install 'frame-picker[motion]'"
+
+# Version of the scoring and selection rules; bump it whenever a change
+# can alter which frames are picked, so stored results are not reused
+ALGORITHM_VERSION = "2"
 
-class FrameData:
-    """Container for frame data and metadata"""
 
-    def __init__(self, image: Image.Image, timestamp: float, frame_number: int):
-        self.image = image
+class FrameData:
+    """Container for frame data and metadata
+
+    ``pixels`` holds the frame as decoded by OpenCV (BGR, uint8) and is None
+    for frames kept only as a reference to their position in the video, e.g.
+    candidates scored on low resolution proxies. A PIL image is only built
+    when ``image`` is accessed. ``motion`` holds the 0-1 motion of frames
+    sampled at motion peaks, measured from the codec's motion vectors.
+    """
+
+    __slots__ = ("pixels", "timestamp", "frame_number", "motion")
+
+    def __init__(
+        self,
+        pixels: Optional[np.ndarray],
+        timestamp: float,
+        frame_number: int,
+        motion: Optional[float] = None,
+    ):
+        self.pixels = pixels
         self.timestamp = timestamp
         self.frame_number = frame_number
+        self.motion = motion
+
+    @property
+    def image(self) -> Optional[Image.Image]:
+        """Frame as an RGB PIL image, converted on each access"""
+        if self.pixels is None:
+            return None
+        return Image.fromarray(cv2.cvtColor(self.pixels, cv2.COLOR_BGR2RGB))
 
     def save(self, path: str) -> bool:
         """Save frame to file"""
         try:
-            self.image.save(path, "JPEG", quality=95)
-            return True
+            return cv2.imwrite(path, self.pixels, [cv2.IMWRITE_JPEG_QUALITY, 95])
         except Exception:
             return False
 
 
+class FrameFeatures:
+    """Per-frame intermediates shared by the scoring metrics
+
+    Each map is computed on first access and memoized, so a frame is
+    converted to grayscale at most once however many metrics use the result.
+    """
+
+    __slots__ = ("pixels", "_gray")
+
+    def __init__(self, pixels: np.ndarray, gray: Optional[np.ndarray] = None):
+        self.pixels = pixels
+        self._gray = gray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Frame height and width"""
+        return self.pixels.shape[:2]
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale frame"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.pixels, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+
+class FrameBatch:
+    """Intermediates of several same-sized frames, computed together
+
+    The grayscale frames are stacked into one contiguous (N, H, W) array so
+    that whole-frame and region statistics take a single vectorized NumPy
+    call per batch. Like FrameFeatures, each statistic is computed on first
+    access and memoized; ``features`` gives per-frame access to the rest.
+    """
+
+    # Height of the thumbnails compared between samples to measure motion
+    THUMBNAIL_HEIGHT = 48
+
+    __slots__ = (
+        "features",
+        "gray",
+        "_thumbnails",
+        "_gray_mean",
+        "_gray_std",
+        "_laplacian_var",
+        "_center_std",
+        "_quadrant_stds",
+    )
+
+    def __init__(self, frames: Sequence[np.ndarray]):
+        h, w = frames[0].shape[:2]
+        self.gray = np.empty((len(frames), h, w), dtype=np.uint8)
+        for i, pixels in enumerate(frames):
+            cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY, dst=self.gray[i])
+
+        self.features = [
+            FrameFeatures(pixels, gray=self.gray[i]) for i, pixels in enumerate(frames)
+        ]
+        self._thumbnails = None
+        self._gray_mean = None
+        self._gray_std = None
+        self._laplacian_var = None
+        self._center_std = None
+        self._quadrant_stds = None
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Frame height and width"""
+        return self.gray.shape[1:]
+
+    @property
+    def thumbnails(self) -> np.ndarray:
+        """Grayscale frames downscaled to THUMBNAIL_HEIGHT, shape (N, h, w)"""
+        if self._thumbnails is None:
+            h, w = self.shape
+            height = min(h, self.THUMBNAIL_HEIGHT)
+            size = (max(1, round(w * height / h)), height)
+            self._thumbnails = np.stack(
+                [
+                    cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+                    for gray in self.gray
+                ]
+            )
+        return self._thumbnails
+
+    @property
+    def gray_mean(self) -> np.ndarray:
+        """Mean grayscale intensity of each frame"""
+        if self._gray_mean is None:
+            self._gray_mean = self.gray.mean(axis=(1, 2))
+        return self._gray_mean
+
+    @property
+    def gray_std(self) -> np.ndarray:
+        """Standard deviation of grayscale intensity of each frame"""
+        if self._gray_std is None:
+            self._gray_std = self.gray.std(axis=(1, 2))
+        return self._gray_std
+
+    @property
+    def laplacian_var(self) -> np.ndarray:
+        """Variance of the Laplacian of each grayscale frame"""
+        if self._laplacian_var is None:
+            # The 3x3 Laplacian of 8-bit input fits in int16 exactly, which
+            # keeps the stack a quarter of the size of a float64 one
+            laplacian = np.empty(self.gray.shape, dtype=np.int16)
+            for gray, out in zip(self.gray, laplacian):
+                cv2.Laplacian(gray, cv2.CV_16S, dst=out)
+            self._laplacian_var = laplacian.var(axis=(1, 2))
+        return self._laplacian_var
+
+    @property
+    def center_std(self) -> np.ndarray:
+        """Grayscale standard deviation of the central third of each frame"""
+        if self._center_std is None:
+            h, w = self.shape
+            center = self.gray[:, h // 3 : 2 * h // 3, w // 3 : 2 * w // 3]
+            self._center_std = center.std(axis=(1, 2))
+        return self._center_std
+
+    @property
+    def quadrant_stds(self) -> np.ndarray:
+        """Grayscale standard deviation of each quadrant, shape (N, 4)"""
+        if self._quadrant_stds is None:
+            gray = self.gray
+            h, w = self.shape
+            regions = [
+                gray[:, 0 : h // 2, 0 : w // 2],  # Top-left
+                gray[:, 0 : h // 2, w // 2 : w],  # Top-right
+                gray[:, h // 2 : h, 0 : w // 2],  # Bottom-left
+                gray[:, h // 2 : h, w // 2 : w],  # Bottom-right
+            ]
+            self._quadrant_stds = np.stack(
+                [region.std(axis=(1, 2)) for region in regions], axis=1
+            )
+        return self._quadrant_stds
+
+
+class FaceDetector:
+    """Face detector backed by an OpenCV cascade or a small cv2.dnn model
+
+    Cascades scan a copy of the frame downscaled so that faces of
+    ``min_size`` pixels just fill the detection window of the classifier;
+    the smaller image has far fewer positions and scales to try. The dnn
+    model resizes its input to a fixed size anyway. Either way the boxes are
+    returned in the coordinates of the full frame.
+
+    If the files of a detector are missing, the Haar cascade shipped with
+    OpenCV is used instead, with a warning, at no finer settings than the
+    "balanced" preset's; ``make models`` fetches the models, which
+    ``make build`` packages.
+    """
+
+    DETECTORS = ("lbp", "haar", "dnn")
+
+    MODELS_DIR = Path(__file__).parent / "models"
+
+    LBP_CASCADE = "lbpcascade_frontalface_improved.xml"
+    HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+    DNN_CONFIG = "deploy.prototxt"
+    DNN_WEIGHTS = "res10_300x300_ssd_iter_140000.caffemodel"
+
+    # Input size and BGR channel means of the res10 SSD face model
+    DNN_INPUT_SIZE = (300, 300)
+    DNN_MEAN = (104.0, 177.0, 123.0)
+    DNN_CONFIDENCE = 0.5
+
+    # Finest settings of the Haar cascade when it replaces another detector:
+    # those of the "balanced" preset, since finer ones cost far more time
+    # without making the cascade as accurate as the detector it replaces
+    FALLBACK_MIN_SIZE = 30
+    FALLBACK_SCALE_FACTOR = 1.1
+
+    def __init__(self, detector: str, min_size: int, scale_factor: float = 1.1):
+        if detector not in self.DETECTORS:
+            raise ValueError(
+                f"Unknown face detector: {detector} "
+                f"(expected one of {', '.join(self.DETECTORS)})"
+            )
+        self.detector = detector
+        self.min_size = min_size
+        self.scale_factor = scale_factor
+        self._load()
+
+    def _load(self) -> None:
+        """Load the detector, falling back to the Haar cascade"""
+        self.backend = None
+        self.model = None
+
+        if self.detector == "dnn":
+            config = self.MODELS_DIR / self.DNN_CONFIG
+            weights = self.MODELS_DIR / self.DNN_WEIGHTS
+            if config.is_file() and weights.is_file():
+                try:
+                    self.model = cv2.dnn.readNetFromCaffe(str(config), str(weights))
+                    self.backend = "dnn"
+                    return
+                except Exception:
+                    pass
+
+        if self.detector == "lbp":
+            self.model = self._load_cascade(
+                [
+                    self.MODELS_DIR / self.LBP_CASCADE,
+                    Path(cv2.data.haarcascades).parent
+                    / "lbpcascades"
+                    / self.LBP_CASCADE,
+                ]
+            )
+            if self.model is not None:
+                self.backend = "cascade"
+                return
+
+        if self.detector != "haar":
+            warnings.warn(
+                f"Could not load the {self.detector} face detector from "
+                f"{self.MODELS_DIR} (run `make models`); falling back to the "
+                "Haar cascade, which is slower and less accurate",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            self.min_size = max(self.min_size, self.FALLBACK_MIN_SIZE)
+            self.scale_factor = max(self.scale_factor, self.FALLBACK_SCALE_FACTOR)
+
+        self.model = self._load_cascade(
+            [Path(cv2.data.haarcascades) / self.HAAR_CASCADE]
+        )
+        if self.model is not None:
+            self.backend = "cascade"
+        else:
+            warnings.warn(
+                "No face detector could be loaded; face scores will be neutral",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+    def _load_cascade(self, paths: Sequence[Path]) -> Optional["cv2.CascadeClassifier"]:
+        """First cascade classifier that loads from paths, or None"""
+        for path in paths:
+            try:
+                if not path.is_file():
+                    continue
+                cascade = cv2.CascadeClassifier(str(path))
+                if not cascade.empty():
+                    return cascade
+            except Exception:
+                continue
+        return None
+
+    def __getstate__(self) -> Dict:
+        # Classifiers and networks cannot be pickled; they are reloaded on
+        # unpickling so detectors can be sent to worker processes
+        state = self.__dict__.copy()
+        state["model"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._load()
+
+    @property
+    def available(self) -> bool:
+        """Whether any detector could be loaded"""
+        return self.model is not None
+
+    def detect(
+        self,
+        features: FrameFeatures,
+        region: Optional[Tuple[int, int, int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Detect faces in a frame
+
+        Args:
+            features: Frame to search
+            region: (x, y, w, h) window to search instead of the whole frame
+
+        Returns:
+            Array of (x, y, w, h) boxes in frame coordinates, shape (N, 4)
+        """
+        x, y = 0, 0
+        if self.backend == "dnn":
+            image = features.pixels
+        else:
+            image = features.gray
+        if region is not None:
+            x, y, w, h = region
+            image = image[y : y + h, x : x + w]
+
+        if self.backend == "dnn":
+            boxes = self._detect_dnn(image)
+        else:
+            boxes = self._detect_cascade(image)
+
+        return boxes + [x, y, 0, 0]
+
+    def _detect_cascade(self, gray: np.ndarray) -> np.ndarray:
+        """Run the cascade on the grayscale image downscaled to min_size"""
+        window = min(self.model.getOriginalWindowSize())
+        scale = min(1.0, window / self.min_size)
+
+        if scale < 1.0:
+            h, w = gray.shape
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+        min_size = max(window, round(self.min_size * scale))
+        faces = self.model.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=5,
+            minSize=(min_size, min_size),
+        )
+        if len(faces) == 0:
+            return np.empty((0, 4), dtype=int)
+
+        return np.round(np.asarray(faces) / scale).astype(int)
+
+    def _detect_dnn(self, pixels: np.ndarray) -> np.ndarray:
+        """Run the SSD face model on the colour image"""
+        h, w = pixels.shape[:2]
+        blob = cv2.dnn.blobFromImage(pixels, 1.0, self.DNN_INPUT_SIZE, self.DNN_MEAN)
+        self.model.setInput(blob)
+
+        # Output rows: (image, class, confidence, x1, y1, x2, y2), corners
+        # normalized to the image size
+        detections = self.model.forward().reshape(-1, 7)
+        detections = detections[detections[:, 2] >= self.DNN_CONFIDENCE]
+
+        corners = np.round(np.clip(detections[:, 3:7], 0.0, 1.0) * [w, h, w, h])
+        boxes = np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]])
+        boxes = boxes.astype(int)
+
+        return boxes[(boxes[:, 2] >= self.min_size) & (boxes[:, 3] >= self.min_size)]
+
+
+class FaceTracker:
+    """Follows faces from an anchor sample to the samples after it
+
+    Nearby samples usually show the same faces in nearly the same place, so
+    instead of searching the whole frame the detector only searches a
+    window around the faces found in the block's anchor. The video is cut
+    into blocks of ``redetect_frames`` frames, and the first sample of each
+    block is the anchor: it always gets a full-frame detection, which picks
+    up faces that entered the frame elsewhere. A sample whose window does
+    not contain every anchor face, or whose anchor has none, gets a
+    full-frame detection too.
+
+    The faces of a sample therefore only depend on the sample and its
+    anchor, not on which other samples were searched, so samples can be
+    skipped, and a sequence can start at any block boundary, without
+    changing the result. Samples must be passed in timestamp order; call
+    ``reset`` before a new sequence.
+    """
+
+    # Fraction of a face's size the search window extends past it on each
+    # side; faces can drift for a whole block away from the anchor
+    SEARCH_MARGIN = 1.0
+
+    def __init__(self, detector: FaceDetector, redetect_frames: int = 150):
+        self.detector = detector
+        self.redetect_frames = max(1, redetect_frames)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the tracked faces"""
+        self.boxes = np.empty((0, 4), dtype=int)
+        self._shape = None
+        self._block = None
+
+    def update(
+        self, features: FrameFeatures, frame_number: int, search: bool = True
+    ) -> Optional[np.ndarray]:
+        """
+        Find the faces of the next sample
+
+        Every sample must be passed, including those whose faces are not
+        needed, so that anchors are detected; with ``search`` False the
+        sample is only searched if it is an anchor.
+
+        Returns:
+            Array of (x, y, w, h) boxes in frame coordinates, shape (N, 4),
+            or None if the sample was not searched
+        """
+        block = frame_number // self.redetect_frames
+        if block != self._block:
+            self.boxes = self.detector.detect(features)
+            self._shape = features.shape
+            self._block = block
+            return self.boxes
+
+        if not search:
+            return None
+
+        if len(self.boxes) and features.shape == self._shape:
+            boxes = self.detector.detect(features, self._search_window())
+            # Every anchor face must be found again, or something changed
+            if len(boxes) == len(self.boxes):
+                return boxes
+
+        return self.detector.detect(features)
+
+    def _search_window(self) -> Tuple[int, int, int, int]:
+        """(x, y, w, h) window around all anchor faces, clipped to the frame"""
+        h, w = self._shape
+        margins = np.round(self.boxes[:, 2:] * self.SEARCH_MARGIN).astype(int)
+        x1, y1 = np.maximum(self.boxes[:, :2] - margins, 0).min(axis=0)
+        x2, y2 = np.minimum(
+            self.boxes[:, :2] + self.boxes[:, 2:] + margins, [w, h]
+        ).max(axis=0)
+        return int(x1), int(y1), int(x2 - x1), int(y2 - y1)
+
+
+class ProxyCache:
+    """Sampled proxy frames of videos, stored next to them as .npy files
+
+    The first pass over a video writes the downscaled frames it samples;
+    later passes with the same sampling read them back memory-mapped
+    instead of decoding the video, so frames are paged in from the OS file
+    cache without being copied. A pass split into ranges stores each range
+    under its own key, and ``merge`` joins them afterwards. Once the
+    proxies under ``root`` (or in the video's directory, without a root)
+    exceed ``max_bytes`` the least recently used are deleted.
+    """
+
+    # Frame number, timestamp and motion (NaN if unknown) of each row of a
+    # proxy file
+    INDEX_DTYPE = np.dtype(
+        [("frame_number", np.int64), ("timestamp", np.float64), ("motion", np.float64)]
+    )
+
+    def __init__(self, max_bytes: Optional[int] = None, root: Optional[Path] = None):
+        self.max_bytes = max_bytes
+        self.root = root
+
+    def paths(self, video_path: Path, key: str) -> Tuple[Path, Path]:
+        """Proxy and index files of a video sampled as described by key"""
+        stem = f"{video_path.stem}.{key}"
+        return (
+            video_path.with_name(f"{stem}.proxies.npy"),
+            video_path.with_name(f"{stem}.proxies-index.npy"),
+        )
+
+    def load(
+        self, video_path: Path, key: str
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Cached proxies of a video
+
+        Returns:
+            Index and read-only memory-mapped frames of shape (N, H, W, 3),
+            or None if the video has no complete proxies for key
+        """
+        proxies_path, index_path = self.paths(video_path, key)
+        try:
+            index = np.load(index_path)
+            frames = np.load(proxies_path, mmap_mode="r")
+            # Mark as recently used for eviction
+            os.utime(proxies_path)
+        except (OSError, ValueError):
+            return None
+
+        if index.dtype != self.INDEX_DTYPE or len(index) != len(frames):
+            return None
+        return index, frames
+
+    def store(
+        self, video_path: Path, key: str, frames: Iterable[FrameData]
+    ) -> Iterator[FrameData]:
+        """
+        Pass frames through, writing them to the cache as they go
+
+        The proxies are only stored once ``frames`` is exhausted, so an
+        interrupted pass leaves nothing behind. Frames are spooled to a raw
+        file and copied into the .npy at the end, when their count is known.
+        """
+        proxies_path, index_path = self.paths(video_path, key)
+        spool_path = proxies_path.with_name(f"{proxies_path.name}.{os.getpid()}.part")
+
+        index = []
+        shape = None
+        complete = False
+
+        try:
+            with open(spool_path, "wb") as spool:
+                for frame_data in frames:
+                    pixels = frame_data.pixels
+                    if shape is None:
+                        shape = pixels.shape
+                    if pixels.shape == shape:
+                        spool.write(np.ascontiguousarray(pixels).data)
+                        index.append(
+                            (
+                                frame_data.frame_number,
+                                frame_data.timestamp,
+                                (
+                                    np.nan
+                                    if frame_data.motion is None
+                                    else frame_data.motion
+                                ),
+                            )
+                        )
+                    else:
+                        # Proxies must stack into one array; give up caching
+                        shape = ()
+
+                    yield frame_data
+
+            complete = shape != ()
+            if complete:
+                if index:
+                    spooled = np.memmap(
+                        spool_path, dtype=np.uint8, mode="r", shape=(len(index), *shape)
+                    )
+                else:
+                    # A range without samples stores empty proxies
+                    spooled = np.empty((0, 0, 0, 3), dtype=np.uint8)
+                index = np.array(index, dtype=self.INDEX_DTYPE)
+                self._write(proxies_path, index_path, index, [spooled])
+                del spooled
+
+        finally:
+            spool_path.unlink(missing_ok=True)
+
+        if complete:
+            self.evict(self.root or video_path.parent)
+
+    def merge(self, video_path: Path, key: str, parts: List[str]) -> bool:
+        """
+        Join the proxies of consecutive ranges into proxies of the whole video
+
+        The parts are deleted afterwards, whether they could be joined or not.
+
+        Returns:
+            True if proxies were stored under key
+        """
+        loaded = [self.load(video_path, part) for part in parts]
+        complete = all(part is not None for part in loaded)
+        if complete:
+            loaded = [(index, frames) for index, frames in loaded if len(index)]
+            complete = len({frames.shape[1:] for _, frames in loaded}) <= 1
+
+        if complete and loaded:
+            proxies_path, index_path = self.paths(video_path, key)
+            index = np.concatenate([index for index, _ in loaded])
+            self._write(
+                proxies_path, index_path, index, [frames for _, frames in loaded]
+            )
+        del loaded
+
+        for part in parts:
+            for path in self.paths(video_path, part):
+                path.unlink(missing_ok=True)
+
+        if complete:
+            self.evict(self.root or video_path.parent)
+        return complete
+
+    def evict(self, directory: Path) -> None:
+        """Delete least recently used proxies until directory fits max_bytes"""
+        if self.max_bytes is None:
+            return
+
+        files = []
+        for proxies_path in directory.rglob("*.proxies.npy"):
+            try:
+                stat = proxies_path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, proxies_path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, proxies_path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            proxies_path.unlink(missing_ok=True)
+            proxies_path.with_name(
+                proxies_path.name.replace(".proxies.npy", ".proxies-index.npy")
+            ).unlink(missing_ok=True)
+            total -= size
+
+    def _write(
+        self,
+        proxies_path: Path,
+        index_path: Path,
+        index: np.ndarray,
+        parts: List[np.ndarray],
+    ) -> None:
+        """Write an index and its frames, concatenated, replacing both at once"""
+        shape = (len(index), *parts[0].shape[1:])
+
+        # Index first: a proxy file is only used when its index matches it
+        partial = f"{proxies_path.name}.{os.getpid()}.partial"
+        partial_index = index_path.with_name(f"{partial}.index")
+        partial_proxies = proxies_path.with_name(f"{partial}.npy")
+        try:
+            with open(partial_index, "wb") as f:
+                np.save(f, index)
+            os.replace(partial_index, index_path)
+
+            proxies = np.lib.format.open_memmap(
+                partial_proxies, mode="w+", dtype=np.uint8, shape=shape
+            )
+            offset = 0
+            for part in parts:
+                proxies[offset : offset + len(part)] = part
+                offset += len(part)
+            proxies.flush()
+            del proxies
+            os.replace(partial_proxies, proxies_path)
+        finally:
+            partial_index.unlink(missing_ok=True)
+            partial_proxies.unlink(missing_ok=True)
+
+
 class FrameExtractor:
     """Extracts frames from video files"""
 
-    def __init__(self, sample_rate: int = 30):
+    # How sample_rate is interpreted: every Nth frame, N samples per second of
+    # video time, N samples in total spread evenly across the video, or the
+    # N frames with the most motion according to the codec's motion vectors
+    SAMPLING_MODES = ("frames", "fps", "budget", "motion")
+
+    # Typical keyframe interval of x264/x265 encodes. Gaps longer than this are
+    # cheaper to cross with a seek (decode from the nearest keyframe) than by
+    # grabbing every frame in between.
+    DEFAULT_SEEK_THRESHOLD = 250
+
+    # Slack when comparing frame timestamps against sampling times, to absorb
+    # rounding in container timestamps
+    TIMESTAMP_TOLERANCE_MS = 0.5
+
+    # Segments shorter than this are not worth a worker process
+    MIN_SEGMENT_FRAMES = 300
+
+    def __init__(
+        self,
+        sample_rate: int = 30,
+        seek_threshold: Optional[int] = None,
+        sampling: str = "frames",
+        workers: int = 1,
+        proxy_height: Optional[int] = None,
+        proxy_cache: Optional[ProxyCache] = None,
+    ):
+        self.sampling = sampling.lower()
+        if self.sampling not in self.SAMPLING_MODES:
+            raise ValueError(
+                f"Unknown sampling mode: {sampling} "
+                f"(expected one of {', '.join(self.SAMPLING_MODES)})"
+            )
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be at least 1")
+        if self.sampling == "motion" and av is None:
+            raise ValueError(
+                f"Motion sampling requires PyAV ({MOTION_SAMPLING_INSTALL})"
+            )
+
         self.sample_rate = sample_rate
+        self.seek_threshold = (
+            seek_threshold
+            if seek_threshold is not None
+            else self.DEFAULT_SEEK_THRESHOLD
+        )
+        self.workers = max(1, workers)
+
+        # Height frames are downscaled to for analysis; the selected frames are
+        # decoded again at full resolution by decode_selected()
+        self.proxy_height = proxy_height
+
+        # Where proxies are kept between passes; only used with proxy_height
+        self.proxy_cache = proxy_cache
+
+        # Frames picked by motion sampling and their motion, per video path
+        self._motion_peak_cache: Dict[str, Dict[int, float]] = {}
 
     def extract_frames(self, video_path: Path) -> List[FrameData]:
         """Extract frames from video at specified sample rate"""
-        frames = []
+        return list(self.iter_frames(video_path))
+
+    def iter_frames(
+        self, video_path: Path, start_frame: int = 0, end_frame: Optional[int] = None
+    ) -> Iterator[FrameData]:
+        """
+        Yield frames from video at specified sample rate, one at a time
+
+        Only sampled frames are decoded into images: frames in between are
+        skipped with ``grab()``, or with a seek when the gap between samples
+        exceeds ``seek_threshold``. Nothing is buffered, so memory use does
+        not depend on video length.
+
+        Args:
+            video_path: Path to the video file
+            start_frame: First frame index of the range to sample
+            end_frame: Frame index where the range ends (exclusive), or None
+                for the end of the video
+
+        The frames sampled from a range are exactly those a full pass would
+        sample within it, so adjacent ranges can be processed independently.
+
+        With a ``proxy_cache``, frames are read from the cached proxies of the
+        video when there are any, and a pass that has to decode stores its
+        proxies for the next one. Those of a range are stored apart, and
+        joined by ``extract_candidates`` and ``extract_scores`` once every
+        range of a split pass is done.
+        """
+        if self.proxy_cache is not None and self.proxy_height:
+            key = self._proxy_key()
+            cached = self.proxy_cache.load(video_path, key)
+            if cached is not None:
+                return self._iter_cached(*cached, start_frame, end_frame)
+            if start_frame != 0 or end_frame is not None:
+                key = self._proxy_key(start_frame, end_frame)
+            return self.proxy_cache.store(
+                video_path,
+                key,
+                self._decode_frames(video_path, start_frame, end_frame),
+            )
+
+        return self._decode_frames(video_path, start_frame, end_frame)
+
+    def _decode_frames(
+        self, video_path: Path, start_frame: int, end_frame: Optional[int]
+    ) -> Iterator[FrameData]:
+        """Decode the sampled frames of a range, as described in iter_frames"""
+        cap = None
 
         try:
             cap = cv2.VideoCapture(str(video_path))
@@ -47,210 +809,1275 @@ class FrameExtractor:
             fps = cap.get(cv2.CAP_PROP_FPS)
             frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-            frame_number = 0
+            motion = {}
+            if self.sampling == "motion":
+                motion = self._motion_peaks(video_path)
 
-            while True:
-                ret, frame = cap.read()
+            if self.sampling == "fps":
+                samples = self._read_timed(cap, start_frame, end_frame)
+            else:
+                positions = (
+                    frame_number
+                    for frame_number in self._sample_positions(video_path, frame_count)
+                    if frame_number >= start_frame
+                )
+                if end_frame is not None:
+                    positions = itertools.takewhile(
+                        lambda frame_number: frame_number < end_frame, positions
+                    )
+                samples = self._read_indexed(cap, positions, fps)
 
-                if not ret:
+            for frame_number, timestamp, frame in samples:
+                if self.proxy_height and frame.shape[0] > self.proxy_height:
+                    frame = self._downscale(frame, self.proxy_height)
+
+                yield FrameData(
+                    pixels=frame,
+                    timestamp=timestamp,
+                    frame_number=frame_number,
+                    motion=motion.get(frame_number),
+                )
+
+        except Exception as e:
+            raise RuntimeError(f"Error extracting frames: {str(e)}")
+
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def previous_sample(
+        self, video_path: Path, frame_number: int
+    ) -> Optional[FrameData]:
+        """
+        The last sample before ``frame_number``, as ``iter_frames`` yields it
+
+        Only the frames around that sample are read, from the cached proxies
+        when there are any; nothing is stored.
+
+        Returns:
+            The sample, or None if no frame before ``frame_number`` is sampled
+        """
+        if frame_number <= 0:
+            return None
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            cap.release()
+
+        if self.sampling == "fps":
+            # Every sampling interval holds a sample, so the frames of one
+            # interval (and one more) before frame_number hold the last one
+            span = math.ceil(fps / self.sample_rate) + 1 if fps > 0 else frame_number
+            start = max(0, frame_number - span)
+        else:
+            start = None
+            for position in self._sample_positions(video_path, frame_count):
+                if position >= frame_number:
                     break
+                start = position
+            if start is None:
+                return None
+
+        cached = None
+        if self.proxy_cache is not None and self.proxy_height:
+            cached = self.proxy_cache.load(video_path, self._proxy_key())
+        if cached is not None:
+            frames = self._iter_cached(*cached, start, frame_number)
+        else:
+            frames = self._decode_frames(video_path, start, frame_number)
+
+        previous = None
+        for previous in frames:
+            pass
+        return previous
+
+    def extract_candidates(
+        self,
+        video_path: Path,
+        selector: "FrameSelector",
+        count: int = 1,
+        min_interval: float = 2.0,
+    ) -> List[Dict]:
+        """
+        Decode and score the video, splitting it across worker processes
+
+        The video is cut into ``workers`` frame ranges. Each range is decoded
+        by its own process, which seeks straight to the range start, scores
+        its frames with ``selector`` and keeps only the candidates that can
+        still be selected. Ranges start on the face tracker's redetection
+        blocks, so face scores do not depend on the split (see
+        ``FaceTracker``). Pass the merged result to
+        ``FrameSelector.select_best_candidates``; the selection is identical
+        to a single serial pass. In action mode each process also reads the
+        sample before its range, to measure the motion of its first frame.
+
+        Only the candidates currently winning keep their pixels, and none
+        do with ``proxy_height`` set; load the selected ones with
+        ``decode_selected``.
 
-                # Sample frames at specified rate
-                if frame_number % self.sample_rate == 0:
-                    # Convert BGR to RGB and create PIL Image
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(rgb_frame)
+        Returns:
+            Scored candidates of all ranges, in range order
+        """
+        segments = self._segments(
+            video_path, align=selector.face_tracker.redetect_frames
+        )
 
-                    timestamp = frame_number / fps if fps > 0 else 0
+        keep_images = self.proxy_height is None
 
-                    frame_data = FrameData(
-                        image=pil_image, timestamp=timestamp, frame_number=frame_number
-                    )
+        if len(segments) <= 1:
+            return selector.collect_candidates(
+                self.iter_frames(video_path),
+                count,
+                min_interval,
+                keep_images,
+                evict_images=True,
+            )
+
+        if self.sampling == "motion" and not self._proxies_cached(video_path):
+            # Scan once here rather than in every worker
+            self._motion_peaks(video_path)
+
+        jobs = [
+            (self, selector, video_path, start, end, count, min_interval, keep_images)
+            for start, end in segments
+        ]
+        results = self._map_segments(_collect_segment_candidates, jobs)
+        self._merge_proxies(video_path, segments)
+
+        # Times add up across processes, measuring work rather than wall time
+        candidates = []
+        selector._reset()
+        for segment_candidates, frames_analyzed, decoding, scoring in results:
+            candidates.extend(segment_candidates)
+            selector.frames_analyzed += frames_analyzed
+            selector.decoding_time += decoding
+            selector.scoring_time += scoring
+
+        return candidates
+
+    def extract_scores(
+        self, video_path: Path, selector: "FrameSelector"
+    ) -> "ScoredFrames":
+        """
+        Decode the video and score every sample on every metric
+
+        Unlike ``extract_candidates`` nothing is pruned or skipped, so the
+        result can be stored and selected from again later with other
+        ``count``, ``min_interval`` or weights (see ``FrameSelector.rescore``).
+        Ranges are split across worker processes as in ``extract_candidates``.
+
+        Returns:
+            Scores of all samples, in timestamp order, without pixels
+        """
+        segments = self._segments(
+            video_path, align=selector.face_tracker.redetect_frames
+        )
+
+        if len(segments) <= 1:
+            return selector.score_all(self.iter_frames(video_path))
+
+        if self.sampling == "motion" and not self._proxies_cached(video_path):
+            # Scan once here rather than in every worker
+            self._motion_peaks(video_path)
+
+        jobs = [(self, selector, video_path, start, end) for start, end in segments]
+        results = self._map_segments(_score_segment, jobs)
+        self._merge_proxies(video_path, segments)
+
+        # Times add up across processes, measuring work rather than wall time
+        parts = []
+        selector._reset()
+        for scored, decoding, scoring in results:
+            parts.append(scored)
+            selector.frames_analyzed += len(scored)
+            selector.decoding_time += decoding
+            selector.scoring_time += scoring
+
+        return ScoredFrames.concatenate(parts)
+
+    def _map_segments(self, function, jobs: List[Tuple]) -> List:
+        """Run one job per segment in worker processes, returning the results"""
+        # Spawned workers do not inherit OpenCV's thread pool state, which
+        # can deadlock after fork()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=context) as executor:
+            return list(executor.map(function, jobs))
+
+    def decode_selected(self, video_path: Path, candidates: List[Dict]) -> List[Dict]:
+        """
+        Decode the frames of selected candidates at full resolution
+
+        Second pass of the proxy analysis: only the winning frames are decoded
+        again, seeking between them when they are far apart. Candidates that
+        still hold their pixels are returned as they are.
+
+        Returns:
+            Copies of ``candidates``, in the same order, whose ``frame`` holds
+            the full resolution image
+        """
+        positions = sorted(
+            {c["frame"].frame_number for c in candidates if c["frame"].pixels is None}
+        )
+        if not positions:
+            return list(candidates)
+
+        decoded = {}
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video file: {video_path}")
+
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            for frame_number, _, frame in self._read_indexed(cap, positions, fps):
+                decoded[frame_number] = frame
+
+        except Exception as e:
+            raise RuntimeError(f"Error decoding selected frames: {str(e)}")
+
+        finally:
+            cap.release()
+
+        missing = [n for n in positions if n not in decoded]
+        if missing:
+            raise RuntimeError(f"Could not decode frames: {missing}")
+
+        return [
+            (
+                {
+                    **candidate,
+                    "frame": FrameData(
+                        pixels=decoded[candidate["frame"].frame_number],
+                        timestamp=candidate["frame"].timestamp,
+                        frame_number=candidate["frame"].frame_number,
+                    ),
+                }
+                if candidate["frame"].pixels is None
+                else candidate
+            )
+            for candidate in candidates
+        ]
+
+    def _iter_cached(
+        self,
+        index: np.ndarray,
+        proxies: np.ndarray,
+        start_frame: int,
+        end_frame: Optional[int],
+    ) -> Iterator[FrameData]:
+        """Yield the cached proxies of a range, as views into the mapped file"""
+        frame_numbers = index["frame_number"]
+        first = np.searchsorted(frame_numbers, start_frame)
+        last = (
+            len(frame_numbers)
+            if end_frame is None
+            else np.searchsorted(frame_numbers, end_frame)
+        )
 
-                    frames.append(frame_data)
+        for i in range(first, last):
+            motion = float(index["motion"][i])
+            yield FrameData(
+                pixels=proxies[i],
+                timestamp=float(index["timestamp"][i]),
+                frame_number=int(frame_numbers[i]),
+                motion=None if math.isnan(motion) else motion,
+            )
 
-                frame_number += 1
+    def _proxies_cached(self, video_path: Path) -> bool:
+        """Whether iter_frames will read the video from cached proxies"""
+        if self.proxy_cache is None or not self.proxy_height:
+            return False
+        return all(
+            path.exists()
+            for path in self.proxy_cache.paths(video_path, self._proxy_key())
+        )
 
+    def _proxy_key(self, start_frame: int = 0, end_frame: Optional[int] = None) -> str:
+        """Name of the proxies sampled with the current settings from a range"""
+        key = f"{self.sampling}{self.sample_rate}-{self.proxy_height}p"
+        if start_frame != 0 or end_frame is not None:
+            key += f".{start_frame}-{'' if end_frame is None else end_frame}"
+        return key
+
+    def _merge_proxies(
+        self, video_path: Path, segments: List[Tuple[int, Optional[int]]]
+    ) -> None:
+        """Join the proxies the workers stored for their segments, if any"""
+        if self.proxy_cache is None or not self.proxy_height:
+            return
+        parts = [self._proxy_key(start, end) for start, end in segments]
+        if self.proxy_cache.paths(video_path, parts[0])[0].exists():
+            self.proxy_cache.merge(video_path, self._proxy_key(), parts)
+
+    def _downscale(self, frame: np.ndarray, height: int) -> np.ndarray:
+        """Resize a frame to the given height, keeping its aspect ratio"""
+        width = max(1, round(frame.shape[1] * height / frame.shape[0]))
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    def _segments(
+        self, video_path: Path, align: int = 1
+    ) -> List[Tuple[int, Optional[int]]]:
+        """
+        Split the video into up to ``workers`` contiguous frame ranges
+
+        Range starts are rounded down to multiples of ``align``, which may
+        leave fewer ranges.
+        """
+        if self.workers <= 1:
+            return [(0, None)]
+
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
             cap.release()
 
+        # Without a reliable frame count the ranges cannot be placed
+        segments = min(self.workers, frame_count // self.MIN_SEGMENT_FRAMES)
+        if segments <= 1:
+            return [(0, None)]
+
+        bounds = sorted(
+            {i * frame_count // segments // align * align for i in range(segments)}
+        )
+        return list(zip(bounds, bounds[1:] + [None]))
+
+    def _sample_positions(self, video_path: Path, frame_count: int) -> Iterator[int]:
+        """Frame numbers to sample in all but "fps" mode, ascending"""
+        if self.sampling == "motion":
+            return iter(self._motion_peaks(video_path))
+
+        if self.sampling == "budget":
+            if frame_count <= 0:
+                raise ValueError("Sample budget requires a known frame count")
+
+            # Centre of each of sample_rate equal slices of the video
+            samples = min(self.sample_rate, frame_count)
+            return ((2 * i + 1) * frame_count // (2 * samples) for i in range(samples))
+
+        if frame_count <= 0:
+            return itertools.count(0, self.sample_rate)
+        return iter(range(0, frame_count, self.sample_rate))
+
+    def _motion_peaks(self, video_path: Path) -> Dict[int, float]:
+        """
+        Motion of the motion peaks of the video, by frame number, ascending
+
+        The video is cut into ``sample_rate`` equal slices and the frame
+        with the most motion is picked from each, so peaks are found all
+        along the video rather than in its single busiest scene. Motion is
+        relative to the busiest peak, which gets 1. A video PyAV decodes no
+        frames of has no peaks.
+        """
+        key = str(video_path)
+        if key not in self._motion_peak_cache:
+            energy = self._scan_motion(video_path)
+            if not len(energy):
+                self._motion_peak_cache[key] = {}
+                return {}
+            samples = min(self.sample_rate, len(energy))
+            bounds = [i * len(energy) // samples for i in range(samples + 1)]
+            peaks = [
+                start + int(np.argmax(energy[start:end]))
+                for start, end in zip(bounds, bounds[1:])
+            ]
+            busiest = max((energy[peak] for peak in peaks), default=0.0)
+            self._motion_peak_cache[key] = {
+                peak: float(energy[peak] / busiest) if busiest > 0 else 0.0
+                for peak in peaks
+            }
+        return self._motion_peak_cache[key]
+
+    def _scan_motion(self, video_path: Path) -> np.ndarray:
+        """
+        Motion of every frame, from the motion vectors of the codec
+
+        Frames go through libavcodec only: they are never converted to
+        images or copied out, and deblocking is skipped since it does not
+        affect the vectors. Each vector's displacement is weighted by the
+        area of its block, relative to the frame area. Intra-coded frames
+        carry no vectors and get 0.
+
+        Returns:
+            Array of motion per frame, in frame order
+        """
+        energy = []
+
+        try:
+            with av.open(str(video_path)) as container:
+                stream = container.streams.video[0]
+                stream.codec_context.options = {
+                    "flags2": "+export_mvs",
+                    "skip_loop_filter": "all",
+                }
+
+                for frame in container.decode(stream):
+                    vectors = frame.side_data.get("MOTION_VECTORS")
+                    if vectors is None:
+                        energy.append(0.0)
+                        continue
+
+                    mvs = vectors.to_ndarray()
+                    scale = np.maximum(mvs["motion_scale"], 1)
+                    displacement = np.hypot(
+                        mvs["motion_x"] / scale, mvs["motion_y"] / scale
+                    )
+                    area = mvs["w"].astype(np.float64) * mvs["h"]
+                    energy.append(
+                        float(np.sum(displacement * area))
+                        / (frame.width * frame.height)
+                    )
+
         except Exception as e:
-            raise RuntimeError(f"Error extracting frames: {str(e)}")
+            raise RuntimeError(f"Error reading motion vectors: {str(e)}")
+
+        return np.array(energy)
+
+    def _read_indexed(
+        self, cap: cv2.VideoCapture, positions: Iterable[int], fps: float
+    ) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """Decode the frames at the given positions"""
+        # Index of the frame the next grab() will return
+        position = 0
+
+        for frame_number in positions:
+            position = self._advance_to(cap, position, frame_number)
+            if position != frame_number:
+                break
+
+            ret, frame = cap.read()
+
+            if not ret:
+                break
+
+            position += 1
+
+            timestamp = frame_number / fps if fps > 0 else 0
+
+            yield frame_number, timestamp, frame
+
+    def _read_timed(
+        self, cap: cv2.VideoCapture, start_frame: int, end_frame: Optional[int]
+    ) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """
+        Decode sample_rate frames per second of video time
+
+        Sampling follows the container timestamps (``CAP_PROP_POS_MSEC``)
+        rather than frame indices, so it stays evenly spaced in time for
+        variable frame rate video. A frame is sampled when a sampling time
+        falls between its timestamp and that of the frame before it, which
+        only depends on those two frames, so a range can start anywhere.
+        """
+        interval_ms = 1000.0 / self.sample_rate
+        last_slot = -1
+        frame_number = start_frame
+
+        if start_frame > 0:
+            if self._advance_to(cap, 0, start_frame - 1) != start_frame - 1:
+                return
+            if not cap.grab():
+                return
+            last_slot = self._time_slot(cap.get(cv2.CAP_PROP_POS_MSEC), interval_ms)
+
+        while end_frame is None or frame_number < end_frame:
+            if not cap.grab():
+                break
+
+            position_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            slot = self._time_slot(position_ms, interval_ms)
+
+            if slot > last_slot:
+                ret, frame = cap.retrieve()
+
+                if not ret:
+                    break
+
+                yield frame_number, position_ms / 1000.0, frame
+
+            last_slot = slot
+            frame_number += 1
+
+    def _time_slot(self, position_ms: float, interval_ms: float) -> int:
+        """Index of the last sampling time at or before a frame timestamp"""
+        return math.floor((position_ms + self.TIMESTAMP_TOLERANCE_MS) / interval_ms)
+
+    def _advance_to(self, cap: cv2.VideoCapture, position: int, target: int) -> int:
+        """
+        Move the capture so that the next read returns frame ``target``
+
+        Frames are skipped with ``grab()``, which demuxes and decodes without
+        the colour conversion and copy done by ``retrieve()``. Gaps longer
+        than ``seek_threshold`` are crossed with a seek instead.
+
+        Returns:
+            Index of the frame the next read will return; lower than
+            ``target`` if the stream ended first
+        """
+        if target - position > self.seek_threshold:
+            if cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+                return target
+
+        while position < target:
+            if not cap.grab():
+                break
+            position += 1
+
+        return position
+
+
+class ScoredFrames:
+    """Scores of many frames, stored column by column
+
+    Parallel arrays of frame numbers, timestamps, total scores and the score
+    of each metric, so that large candidate sets can be sliced, ranked and
+    passed around without a dict per frame. ``frames`` optionally holds the
+    FrameData of each row.
+
+    Indexing with a slice, an integer array or a boolean mask returns a new
+    ScoredFrames with the chosen rows.
+    """
+
+    __slots__ = ("frame_numbers", "timestamps", "scores", "metrics", "frames")
+
+    def __init__(
+        self,
+        frame_numbers: Sequence[int],
+        timestamps: Sequence[float],
+        scores: Sequence[float],
+        metrics: Optional[Dict[str, Sequence[float]]] = None,
+        frames: Optional[Sequence[FrameData]] = None,
+    ):
+        self.frame_numbers = np.asarray(frame_numbers, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.metrics = {
+            name: np.asarray(values, dtype=np.float64)
+            for name, values in (metrics or {}).items()
+        }
+
+        self.frames = None
+        if frames is not None:
+            # Filled element-wise so NumPy does not look inside the frames
+            self.frames = np.empty(len(frames), dtype=object)
+            self.frames[:] = list(frames)
+
+    @classmethod
+    def from_candidates(cls, candidates: Sequence[Dict]) -> "ScoredFrames":
+        """Build from the candidate dicts of ``FrameSelector``"""
+        names = list(candidates[0].get("metrics", {})) if candidates else []
+        return cls(
+            frame_numbers=[c["frame"].frame_number for c in candidates],
+            timestamps=[c["timestamp"] for c in candidates],
+            scores=[c["score"] for c in candidates],
+            metrics={name: [c["metrics"][name] for c in candidates] for name in names},
+            frames=[c["frame"] for c in candidates],
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["ScoredFrames"]) -> "ScoredFrames":
+        """Join several containers with the same metrics, in the given order"""
+        if not parts:
+            return cls([], [], [])
+        frames = None
+        if all(part.frames is not None for part in parts):
+            frames = np.concatenate([part.frames for part in parts])
+        return cls(
+            frame_numbers=np.concatenate([part.frame_numbers for part in parts]),
+            timestamps=np.concatenate([part.timestamps for part in parts]),
+            scores=np.concatenate([part.scores for part in parts]),
+            metrics={
+                name: np.concatenate([part.metrics[name] for part in parts])
+                for name in parts[0].metrics
+            },
+            frames=frames,
+        )
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __getitem__(self, index) -> "ScoredFrames":
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return ScoredFrames(
+            frame_numbers=self.frame_numbers[index],
+            timestamps=self.timestamps[index],
+            scores=self.scores[index],
+            metrics={name: values[index] for name, values in self.metrics.items()},
+            frames=self.frames[index] if self.frames is not None else None,
+        )
+
+    def ranking(self) -> np.ndarray:
+        """Row positions by score, highest first; ties keep row order"""
+        return np.argsort(-self.scores, kind="stable")
+
+    def ranked(self) -> "ScoredFrames":
+        """Rows sorted by score, highest first"""
+        return self[self.ranking()]
+
+    def chronological(self) -> "ScoredFrames":
+        """Rows sorted by timestamp"""
+        return self[np.argsort(self.timestamps, kind="stable")]
+
+    def select(self, count: int = 1, min_interval: float = 2.0) -> np.ndarray:
+        """
+        Best rows at least ``min_interval`` seconds apart, by greedy selection
+
+        Returns:
+            Positions of the selected rows, in timestamp order
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+
+        order = self.ranking()
+
+        # If only one frame requested, return the best one
+        if count == 1:
+            return order[:1]
+
+        ranks = _greedy_spread(self.timestamps[order].tolist(), count, min_interval)
+        picks = order[ranks]
+        return picks[np.argsort(self.timestamps[picks], kind="stable")]
+
+    def to_records(self) -> List[Dict]:
+        """One dict of plain Python values per row"""
+        columns = {
+            "frame_number": self.frame_numbers.tolist(),
+            "timestamp": self.timestamps.tolist(),
+            "score": self.scores.tolist(),
+            **{name: values.tolist() for name, values in self.metrics.items()},
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def to_json(self) -> str:
+        """Columns as a JSON object of arrays"""
+        return json.dumps(
+            {
+                "frame_number": self.frame_numbers.tolist(),
+                "timestamp": self.timestamps.tolist(),
+                "score": self.scores.tolist(),
+                "metrics": {
+                    name: values.tolist() for name, values in self.metrics.items()
+                },
+            }
+        )
+
+    def to_candidates(self) -> List[Dict]:
+        """
+        Rows as the candidate dicts of ``FrameSelector``
+
+        Rows without a frame get a reference holding only its position; load
+        the pixels with ``FrameExtractor.decode_selected``.
+        """
+        records = self.to_records()
+        candidates = []
+        for i, record in enumerate(records):
+            frame_data = self.frames[i] if self.frames is not None else None
+            if frame_data is None:
+                frame_data = FrameData(
+                    pixels=None,
+                    timestamp=record["timestamp"],
+                    frame_number=record["frame_number"],
+                )
+            candidates.append(
+                {
+                    "frame": frame_data,
+                    "score": record["score"],
+                    "timestamp": record["timestamp"],
+                    "metrics": {name: record[name] for name in self.metrics},
+                }
+            )
+        return candidates
+
+    def save(self, path: Path, metadata: Optional[Dict] = None) -> None:
+        """
+        Store the columns, without frames, as a compressed ``.npz`` file
+
+        ``metadata`` is stored alongside as JSON, e.g. the settings the
+        scores were computed with.
+        """
+        np.savez_compressed(
+            path,
+            frame_numbers=self.frame_numbers,
+            timestamps=self.timestamps,
+            scores=self.scores,
+            metadata=np.array(json.dumps(metadata or {})),
+            **{f"metric_{name}": values for name, values in self.metrics.items()},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["ScoredFrames", Dict]:
+        """Read a file written by ``save``, returning the scores and metadata"""
+        with np.load(path) as data:
+            scored = cls(
+                frame_numbers=data["frame_numbers"],
+                timestamps=data["timestamps"],
+                scores=data["scores"],
+                metrics={
+                    key[len("metric_") :]: data[key]
+                    for key in data.files
+                    if key.startswith("metric_")
+                },
+            )
+            metadata = json.loads(str(data["metadata"]))
+        return scored, metadata
+
+
+class CandidatePool:
+    """Scored frames that can still be selected, fed one at a time
+
+    Frames are buffered as they are added and periodically merged into the
+    ranked survivors, dropping those that can never be selected whatever
+    frames come next (see ``_prune``). Each survivor ranked below the
+    ``2 * count`` mutually distant frames that bound the ranking is within
+    ``min_interval`` of one of them, so the pool holds at most ``2 * count``
+    windows of ``2 * min_interval`` worth of samples, however long the
+    input.
+
+    With ``evict_images``, only the frames the selection would currently
+    pick keep their pixels; the others keep just their position, and the
+    ones that end up selected after all are loaded again with
+    ``FrameExtractor.decode_selected``.
+    """
+
+    # Number of scored candidates buffered before the first pruning pass
+    PRUNE_BATCH_SIZE = 64
+
+    def __init__(
+        self,
+        count: int = 1,
+        min_interval: float = 2.0,
+        keep_images: bool = True,
+        evict_images: bool = False,
+    ):
+        self.count = count
+        self.min_interval = min_interval
+        self.keep_images = keep_images
+        self.evict_images = evict_images
+
+        # Score frames added later must exceed to be selectable
+        self.threshold = -np.inf
+
+        self._ranked = []  # survivors of the last pruning pass, best first
+        self._pending = []  # frames added since, in arrival order
+
+    def __len__(self) -> int:
+        return len(self._ranked) + len(self._pending)
+
+    def add(
+        self,
+        frame_data: FrameData,
+        score: float,
+        metrics: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """Add a scored frame; frames must arrive in timestamp order"""
+        if score <= self.threshold:
+            return
+
+        if not self.keep_images:
+            frame_data = _frame_reference(frame_data)
+
+        self._pending.append(
+            {
+                "frame": frame_data,
+                "score": score,
+                "timestamp": frame_data.timestamp,
+                "metrics": metrics or {},
+            }
+        )
+
+        if len(self._pending) >= max(len(self._ranked), self.PRUNE_BATCH_SIZE):
+            self._prune()
+
+    def candidates(self) -> List[Dict]:
+        """Surviving candidates, best first, for ``select_best_candidates``"""
+        self._prune()
+        return list(self._ranked)
+
+    def _prune(self) -> None:
+        """
+        Drop candidates that can never be selected, whatever frames come next
+
+        Greedy selection with a minimum interval picks a maximal set of
+        mutually distant frames in score order. Any such set is at least half
+        the size of the largest set of mutually distant frames, because one
+        picked frame is within ``min_interval`` of at most two frames that are
+        themselves ``min_interval`` apart. So once the higher-scored
+        candidates contain ``2 * count`` mutually distant frames, greedy
+        selection fills up before reaching anything ranked lower, and more
+        frames arriving later only make that truer.
+        """
+        # Stable sort keeps earlier frames first among equal scores, and the
+        # merge puts survivors, which all arrived earlier, before pending
+        # frames of equal score, matching the final ranking
+        self._pending.sort(key=lambda x: x["score"], reverse=True)
+        ranked = list(
+            heapq.merge(
+                self._ranked, self._pending, key=lambda x: x["score"], reverse=True
+            )
+        )
+        self._pending = []
+
+        if not ranked:
+            self._ranked = ranked
+            return
+
+        if self.count == 1:
+            self._ranked = ranked[:1]
+            self.threshold = ranked[0]["score"]
+            return
+
+        picks = _greedy_spread(
+            [c["timestamp"] for c in ranked], 2 * self.count, self.min_interval
+        )
+        if len(picks) >= 2 * self.count:
+            last = picks[-1]
+            ranked = ranked[: last + 1]
+            self.threshold = ranked[last]["score"]
 
-        return frames
+        if self.evict_images:
+            selected = set(picks[: self.count])
+            for rank, candidate in enumerate(ranked):
+                if rank not in selected and candidate["frame"].pixels is not None:
+                    candidate["frame"] = _frame_reference(candidate["frame"])
+
+        self._ranked = ranked
 
 
 class FrameSelector:
     """Selects the best frame based on specified criteria"""
 
-    def __init__(self, mode: str = "profile", quality: str = "balanced"):
+    # Number of frames scored together by collect_candidates
+    DEFAULT_BATCH_SIZE = 16
+
+    # Weight of each metric in the total score per mode, in summation order.
+    # Every metric is normalized to 0-1.
+    SCORE_WEIGHTS = {
+        "profile": {
+            "sharpness": 0.3,
+            "brightness": 0.2,
+            "contrast": 0.2,
+            "face": 0.2,
+            "composition": 0.1,
+        },
+        "action": {
+            "sharpness": 0.25,
+            "brightness": 0.15,
+            "contrast": 0.2,
+            "motion": 0.25,
+            "composition": 0.15,
+        },
+    }
+
+    # Costly metric per mode, only computed for frames that can still be selected
+    EXPENSIVE_METRICS = {"profile": "face", "action": "motion"}
+
+    # Rounding slack allowed when checking that weights add up to at most 1
+    WEIGHT_TOLERANCE = 1e-9
+
+    # Thumbnail pixels whose intensity changes by more than this between
+    # samples count as moving
+    MOTION_THRESHOLD = 15
+
+    def __init__(
+        self,
+        mode: str = "profile",
+        quality: str = "balanced",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        weights: Optional[Dict[str, float]] = None,
+    ):
         self.mode = mode.lower()
         self.quality = quality.lower()
+        self.batch_size = max(1, batch_size)
+
+        # Metric weights of the mode, with any overrides; weights must not be
+        # negative for score_metrics to bound scores before the costly metric,
+        # and add up to at most 1 so that total scores stay within 0-1
+        self.weights = {**self.SCORE_WEIGHTS[self.mode], **(weights or {})}
+        unknown = set(self.weights) - set(self.SCORE_WEIGHTS[self.mode])
+        if unknown:
+            raise ValueError(
+                f"Unknown metrics for {self.mode} mode: {', '.join(sorted(unknown))}"
+            )
+        if any(weight < 0 for weight in self.weights.values()):
+            raise ValueError("Metric weights must not be negative")
+        if sum(self.weights.values()) > 1.0 + self.WEIGHT_TOLERANCE:
+            raise ValueError(
+                f"Metric weights must add up to at most 1, got "
+                f"{sum(self.weights.values()):g}"
+            )
 
-        # Quality settings affect analysis depth
+        # Quality settings affect analysis depth and the face detector used:
+        # faster detectors, coarser scale steps and rarer full-frame
+        # detections (see FaceTracker) for the faster presets
         self.quality_settings = {
-            "fast": {"blur_threshold": 100, "face_min_size": 50},
-            "balanced": {"blur_threshold": 150, "face_min_size": 30},
-            "best": {"blur_threshold": 200, "face_min_size": 20},
+            "fast": {
+                "blur_threshold": 100,
+                "face_min_size": 50,
+                "face_detector": "lbp",
+                "face_scale_factor": 1.2,
+                "face_redetect_frames": 300,
+            },
+            "balanced": {
+                "blur_threshold": 150,
+                "face_min_size": 30,
+                "face_detector": "haar",
+                "face_scale_factor": 1.1,
+                "face_redetect_frames": 150,
+            },
+            "best": {
+                "blur_threshold": 200,
+                "face_min_size": 20,
+                "face_detector": "dnn",
+                "face_scale_factor": 1.05,
+                "face_redetect_frames": 90,
+            },
         }
 
         self.settings = self.quality_settings[self.quality]
 
-        # Load OpenCV face cascade
-        try:
-            self.face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-            )
-        except Exception:
-            self.face_cascade = None
+        # Number of frames scored by the last select_best_frames call, and the
+        # seconds spent waiting for them to be decoded and scoring them
+        self.frames_analyzed = 0
+        self.decoding_time = 0.0
+        self.scoring_time = 0.0
+
+        # Thumbnail of the last sample scored, to measure motion against
+        self._previous_thumbnail = None
+
+        self.face_detector = FaceDetector(
+            self.settings["face_detector"],
+            min_size=self.settings["face_min_size"],
+            scale_factor=self.settings["face_scale_factor"],
+        )
+        self.face_tracker = FaceTracker(
+            self.face_detector,
+            redetect_frames=self.settings["face_redetect_frames"],
+        )
 
     def select_best_frames(
-        self, frames: List[FrameData], count: int = 1, min_interval: float = 2.0
+        self, frames: Iterable[FrameData], count: int = 1, min_interval: float = 2.0
     ) -> List[Dict]:
         """
         Select the best N frames from the list with minimum time interval between them
 
+        Frames are scored as they are consumed, so ``frames`` can be a
+        generator such as ``FrameExtractor.iter_frames``. Candidates that can
+        no longer be selected are dropped along the way (see
+        ``CandidatePool``), so peak memory depends on ``count`` and
+        ``min_interval`` rather than on video length.
+
         Args:
-            frames: List of FrameData objects to analyze
+            frames: FrameData objects to analyze, in timestamp order
             count: Number of best frames to return (default: 1)
             min_interval: Minimum time interval between selected frames in seconds (default: 2.0)
 
         Returns:
             List of dictionaries containing frame data, scores, and timestamps
         """
-        if not frames:
-            return []
-
-        # Score all frames first
-        scored_frames = []
-        for frame_data in frames:
-            score = self._score_frame(frame_data)
-            scored_frames.append(
-                {"frame": frame_data, "score": score, "timestamp": frame_data.timestamp}
-            )
+        candidates = self.collect_candidates(frames, count, min_interval)
+        return self.select_best_candidates(candidates, count, min_interval)
+
+    def collect_candidates(
+        self,
+        frames: Iterable[FrameData],
+        count: int = 1,
+        min_interval: float = 2.0,
+        keep_images: bool = True,
+        evict_images: bool = False,
+        previous: Optional[FrameData] = None,
+    ) -> List[Dict]:
+        """
+        Score frames and keep the candidates that can still be selected
 
-        # Sort by score (highest first)
-        scored_frames.sort(key=lambda x: x["score"], reverse=True)
+        Args:
+            frames: FrameData objects to analyze, in timestamp order
+            count: Number of frames that will be selected
+            min_interval: Minimum time interval between selected frames in seconds
+            keep_images: Keep the pixels of each candidate; when False only
+                its frame number and timestamp are kept
+            evict_images: Keep pixels only for the frames currently winning;
+                load the others with ``FrameExtractor.decode_selected``
+            previous: Sample just before ``frames``, when they continue a
+                sequence; the motion of the first frame is measured against it
 
-        # If only one frame requested, return the best one
-        if count == 1:
-            return scored_frames[:1] if scored_frames else []
-
-        # Select frames with minimum interval constraint
-        selected_frames = []
-
-        for candidate in scored_frames:
-            # Check if this frame is far enough from already selected frames
-            is_valid = True
-            for selected in selected_frames:
-                time_diff = abs(candidate["timestamp"] - selected["timestamp"])
-                if time_diff < min_interval:
-                    is_valid = False
-                    break
+        Returns:
+            Scored candidates, best first, for ``select_best_candidates``
+        """
+        self._reset(previous)
+
+        # Score frames in batches as they arrive. Frames scoring no more than
+        # the pool threshold can never be selected, so their expensive
+        # metrics are skipped altogether.
+        pool = CandidatePool(count, min_interval, keep_images, evict_images)
+        for batch in self._timed_batches(frames):
+            start = time.perf_counter()
+            metrics = self.score_metrics(batch, pool.threshold)
+            scores = metrics.pop("score")
+
+            for i, (frame_data, score) in enumerate(zip(batch, scores)):
+                if score > pool.threshold:
+                    pool.add(
+                        frame_data,
+                        score,
+                        {name: float(values[i]) for name, values in metrics.items()},
+                    )
+            self.scoring_time += time.perf_counter() - start
+            self.frames_analyzed += len(batch)
 
-            if is_valid:
-                selected_frames.append(candidate)
+        return pool.candidates()
 
-                # Stop if we have enough frames
-                if len(selected_frames) >= count:
-                    break
+    def select_best_candidates(
+        self, candidates: List[Dict], count: int = 1, min_interval: float = 2.0
+    ) -> List[Dict]:
+        """
+        Select the best N scored candidates with minimum time interval between them
 
-        # Sort selected frames by timestamp for consistent output
-        selected_frames.sort(key=lambda x: x["timestamp"])
+        ``candidates`` may merge the results of several ``collect_candidates``
+        calls, e.g. one per video segment, as long as they are concatenated in
+        timestamp order of the segments. Ties in score go to the candidate
+        that comes first.
 
-        return selected_frames
+        Returns:
+            The selected candidates, in timestamp order
+        """
+        positions = ScoredFrames.from_candidates(candidates).select(count, min_interval)
+        return [candidates[i] for i in positions]
+
+    def score_all(
+        self, frames: Iterable[FrameData], previous: Optional[FrameData] = None
+    ) -> ScoredFrames:
+        """
+        Score every frame on every metric, without pruning
+
+        Args:
+            frames: FrameData objects to analyze, in timestamp order
+            previous: Sample just before ``frames``, as in ``collect_candidates``
+
+        Returns:
+            Scores of all frames, without their pixels
+        """
+        self._reset(previous)
+
+        parts = []
+        for batch in self._timed_batches(frames):
+            start = time.perf_counter()
+            metrics = self.score_metrics(batch)
+            parts.append(
+                ScoredFrames(
+                    frame_numbers=[frame_data.frame_number for frame_data in batch],
+                    timestamps=[frame_data.timestamp for frame_data in batch],
+                    scores=metrics.pop("score"),
+                    metrics=metrics,
+                )
+            )
+            self.scoring_time += time.perf_counter() - start
+            self.frames_analyzed += len(batch)
+
+        if not parts:
+            return ScoredFrames([], [], [], metrics={name: [] for name in self.weights})
+        return ScoredFrames.concatenate(parts)
+
+    def rescore(self, scored: ScoredFrames) -> ScoredFrames:
+        """Copy of ``scored`` with totals recomputed from its metrics and weights"""
+        missing = set(self.weights) - set(scored.metrics)
+        if missing:
+            raise ValueError(f"Scores lack metrics: {', '.join(sorted(missing))}")
+
+        return ScoredFrames(
+            frame_numbers=scored.frame_numbers,
+            timestamps=scored.timestamps,
+            scores=self._combine_scores(scored.metrics),
+            metrics=scored.metrics,
+            frames=scored.frames,
+        )
+
+    def _reset(self, previous: Optional[FrameData] = None) -> None:
+        """
+        Forget the counters and tracking state of the previous pass
+
+        A pass continuing after the sample ``previous`` measures motion
+        against it, as a pass that had scored it would.
+        """
+        self.frames_analyzed = 0
+        self.decoding_time = 0.0
+        self.scoring_time = 0.0
+        self.face_tracker.reset()
+        self._previous_thumbnail = None
+        if previous is not None and self.mode == "action":
+            self._previous_thumbnail = FrameBatch([previous.pixels]).thumbnails[0]
+
+    def _timed_batches(self, frames: Iterable[FrameData]) -> Iterator[List]:
+        """Batches of frames, adding the time taken to produce them to decoding_time"""
+        batches = _batched(frames, self.batch_size)
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            self.decoding_time += time.perf_counter() - start
+            if batch is None:
+                return
+            yield batch
 
     def select_best_frame(self, frames: List[FrameData]) -> Optional[Dict]:
         """Select the best single frame from the list (backward compatibility)"""
         results = self.select_best_frames(frames, count=1)
         return results[0] if results else None
 
-    def _score_frame(self, frame_data: FrameData) -> float:
-        """Score a frame based on quality metrics"""
-        cv_image = cv2.cvtColor(np.array(frame_data.image), cv2.COLOR_RGB2BGR)
+    def score_frames(
+        self, frames: Sequence[FrameData], threshold: float = -np.inf
+    ) -> np.ndarray:
+        """
+        Score several frames at once
+
+        Returns:
+            Array of total scores, one per frame; frames that cannot exceed
+            ``threshold`` get -inf (see ``score_metrics``)
+        """
+        return self.score_metrics(frames, threshold)["score"]
+
+    def score_metrics(
+        self, frames: Sequence[FrameData], threshold: float = -np.inf
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score several frames at once, metric by metric
+
+        Frames of equal size are scored as one FrameBatch, so per-frame
+        statistics come from vectorized calls over the whole batch. Metrics
+        run as a cascade: the cheap ones first for every frame, then the
+        expensive one only for frames whose score could still exceed
+        ``threshold`` with that metric at its maximum.
+
+        Args:
+            frames: FrameData objects to score
+            threshold: Score that a frame must exceed to be of interest
+
+        Returns:
+            Arrays of scores, one value per frame, for each metric of the mode
+            and under "score" for the weighted total; frames that cannot
+            exceed ``threshold`` get a total of -inf and an expensive metric
+            of 0
+        """
+        names = [*self.weights, "score"]
+        if not frames:
+            return {name: np.empty(0) for name in names}
+
+        shape = frames[0].pixels.shape
+        if any(frame_data.pixels.shape != shape for frame_data in frames):
+            parts = [
+                self.score_metrics([frame_data], threshold) for frame_data in frames
+            ]
+            return {
+                name: np.concatenate([part[name] for part in parts]) for name in names
+            }
+
+        batch = FrameBatch([frame_data.pixels for frame_data in frames])
 
         # Base quality metrics
-        sharpness_score = self._calculate_sharpness(cv_image)
-        brightness_score = self._calculate_brightness(cv_image)
-        contrast_score = self._calculate_contrast(cv_image)
+        metrics = {
+            "sharpness": self._calculate_sharpness(batch),
+            "brightness": self._calculate_brightness(batch),
+            "contrast": self._calculate_contrast(batch),
+        }
 
         # Mode-specific scoring
         if self.mode == "profile":
-            face_score = self._calculate_face_score(cv_image)
-            composition_score = self._calculate_composition_score(
-                cv_image, focus="center"
+            metrics["composition"] = self._calculate_composition_score(
+                batch, focus="center"
             )
         else:  # action mode
-            motion_score = self._calculate_motion_score(cv_image)
-            composition_score = self._calculate_composition_score(
-                cv_image, focus="dynamic"
+            metrics["composition"] = self._calculate_composition_score(
+                batch, focus="dynamic"
             )
-            face_score = 0.5  # Neutral face score for action shots
 
-        # Weighted combination
-        if self.mode == "profile":
-            total_score = (
-                sharpness_score * 0.3
-                + brightness_score * 0.2
-                + contrast_score * 0.2
-                + face_score * 0.2
-                + composition_score * 0.1
-            )
-        else:
-            total_score = (
-                sharpness_score * 0.25
-                + brightness_score * 0.15
-                + contrast_score * 0.2
-                + motion_score * 0.25
-                + composition_score * 0.15
+        # Best score each frame could reach, then the expensive metric for the
+        # frames that can still beat the threshold. Rounding is monotonic, so
+        # the bound is never below the actual total.
+        expensive = self.EXPENSIVE_METRICS[self.mode]
+        bound = self._combine_scores({**metrics, expensive: np.ones(len(batch))})
+        alive = np.flatnonzero(bound > threshold)
+
+        metrics[expensive] = np.zeros(len(batch))
+        if expensive == "face":
+            # Runs for every frame, so the tracker sees the anchors of frames
+            # that cannot be selected too
+            metrics[expensive][alive] = self._calculate_face_score(batch, frames, alive)
+        elif len(alive):
+            metrics[expensive][alive] = self._calculate_motion_score(
+                batch, frames, alive
             )
 
-        return total_score
+        if self.mode == "action":
+            # Later samples are compared against the last one of this batch
+            self._previous_thumbnail = batch.thumbnails[-1]
+
+        total_score = self._combine_scores(metrics)
+        total_score[bound <= threshold] = -np.inf
 
-    def _calculate_sharpness(self, image: np.ndarray) -> float:
+        return {
+            **{name: metrics[name] for name in self.weights},
+            "score": total_score,
+        }
+
+    def _combine_scores(self, metrics: Dict[str, np.ndarray]) -> np.ndarray:
+        """Weighted combination of metric scores"""
+        return sum(metrics[name] * weight for name, weight in self.weights.items())
+
+    def _score_frame(self, frame_data: FrameData) -> float:
+        """Score a frame based on quality metrics"""
+        return self.score_frames([frame_data])[0]
+
+    def _calculate_sharpness(self, batch: FrameBatch) -> np.ndarray:
         """Calculate image sharpness using Laplacian variance"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        laplacian_var = batch.laplacian_var
 
         # Normalize to 0-1 range
-        return min(laplacian_var / self.settings["blur_threshold"], 1.0)
+        return np.minimum(laplacian_var / self.settings["blur_threshold"], 1.0)
 
-    def _calculate_brightness(self, image: np.ndarray) -> float:
+    def _calculate_brightness(self, batch: FrameBatch) -> np.ndarray:
         """Calculate optimal brightness score"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        mean_brightness = np.mean(gray)
+        mean_brightness = batch.gray_mean
 
         # Optimal brightness is around 127 (middle of 0-255 range)
-        brightness_diff = abs(mean_brightness - 127) / 127
+        brightness_diff = np.abs(mean_brightness - 127) / 127
         return 1.0 - brightness_diff
 
-    def _calculate_contrast(self, image: np.ndarray) -> float:
+    def _calculate_contrast(self, batch: FrameBatch) -> np.ndarray:
         """Calculate image contrast"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        contrast = gray.std()
+        contrast = batch.gray_std
 
         # Normalize contrast (typical range 0-80)
-        return min(contrast / 80.0, 1.0)
-
-    def _calculate_face_score(self, image: np.ndarray) -> float:
-        """Calculate face detection score for profile mode"""
-        if self.face_cascade is None:
-            return 0.5  # Neutral score if face detection unavailable
-
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(self.settings["face_min_size"], self.settings["face_min_size"]),
-        )
+        return np.minimum(contrast / 80.0, 1.0)
+
+    def _calculate_face_score(
+        self, batch: FrameBatch, frames: Sequence[FrameData], indices: Sequence[int]
+    ) -> np.ndarray:
+        """Calculate face detection score for profile mode, for frames at indices"""
+        if not self.face_detector.available:
+            # Neutral score if face detection unavailable
+            return np.full(len(indices), 0.5)
+
+        wanted = set(int(i) for i in indices)
+        scores = []
+        for i, frame_data in enumerate(frames):
+            features = batch.features[i]
+            faces = self.face_tracker.update(
+                features, frame_data.frame_number, search=i in wanted
+            )
+            if i in wanted:
+                scores.append(self._face_score(features, faces))
+        return np.array(scores)
 
+    def _face_score(self, features: FrameFeatures, faces: np.ndarray) -> float:
+        """Face detection score of a single frame from the faces found in it"""
         if len(faces) == 0:
             return 0.1  # Low score for no faces
         elif len(faces) == 1:
             # Single face - check size and position
             x, y, w, h = faces[0]
             face_area = w * h
-            image_area = image.shape[0] * image.shape[1]
+            image_area = features.shape[0] * features.shape[1]
             face_ratio = face_area / image_area
 
             # Prefer faces that take up 5-30% of the image
@@ -261,39 +2088,140 @@ class FrameSelector:
         else:
             return 0.6  # Multiple faces - decent but not ideal for profile
 
-    def _calculate_motion_score(self, image: np.ndarray) -> float:
-        """Calculate motion/action score for action mode"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-        # Use edge detection to find areas of high activity
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / (edges.shape[0] * edges.shape[1])
+    def _calculate_motion_score(
+        self, batch: FrameBatch, frames: Sequence[FrameData], indices: Sequence[int]
+    ) -> np.ndarray:
+        """Calculate motion/action score for action mode, for frames at indices"""
+        indices = np.asarray(indices)
+
+        # Motion peaks come with the motion of their codec's motion vectors;
+        # they can be far apart, so comparing them with each other would
+        # measure the change of scene rather than motion
+        motion = np.array(
+            [np.nan if frames[i].motion is None else frames[i].motion for i in indices]
+        )
+        unknown = np.isnan(motion)
+        if unknown.any():
+            motion[unknown] = self._thumbnail_motion(batch, indices[unknown])
+        return motion
+
+    def _thumbnail_motion(self, batch: FrameBatch, indices: np.ndarray) -> np.ndarray:
+        """Share of each frame at indices changed since the sample before it"""
+        # Compare each thumbnail with that of the sample before it. The first
+        # sample of a sequence has none and is compared with the next one.
+        thumbnails = batch.thumbnails
+        previous = self._previous_thumbnail
+        if previous is None or previous.shape != thumbnails.shape[1:]:
+            previous = thumbnails[min(1, len(batch) - 1)]
+        references = np.concatenate([previous[np.newaxis], thumbnails[:-1]])
+
+        diff = np.abs(
+            thumbnails[indices].astype(np.int16) - references[indices].astype(np.int16)
+        )
+        moving = np.count_nonzero(diff > self.MOTION_THRESHOLD, axis=(1, 2))
+        moving_ratio = moving / (thumbnails.shape[1] * thumbnails.shape[2])
 
-        # Higher edge density suggests more action/motion
-        return min(edge_density * 5, 1.0)  # Scale appropriately
+        # A quarter of the frame changing already counts as full action
+        return np.minimum(moving_ratio * 4, 1.0)
 
-    def _calculate_composition_score(self, image: np.ndarray, focus: str) -> float:
+    def _calculate_composition_score(self, batch: FrameBatch, focus: str) -> np.ndarray:
         """Calculate composition score based on focus type"""
-        h, w = image.shape[:2]
-
         if focus == "center":
             # For profile pics, prefer centered subjects
             # This is a simplified rule of thirds check
-            center_region = image[h // 3 : 2 * h // 3, w // 3 : 2 * w // 3]
-            center_activity = cv2.cvtColor(center_region, cv2.COLOR_BGR2GRAY).std()
-            return min(center_activity / 50.0, 1.0)
+            return np.minimum(batch.center_std / 50.0, 1.0)
         else:  # dynamic
             # For action shots, prefer more distributed activity
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            # Check activity distribution across the image
-            regions = [
-                gray[0 : h // 2, 0 : w // 2],  # Top-left
-                gray[0 : h // 2, w // 2 : w],  # Top-right
-                gray[h // 2 : h, 0 : w // 2],  # Bottom-left
-                gray[h // 2 : h, w // 2 : w],  # Bottom-right
-            ]
-
-            region_stds = [region.std() for region in regions]
+            # across the four quadrants of the image
+            region_stds = batch.quadrant_stds
             # Prefer images with activity in multiple regions
-            active_regions = sum(1 for std in region_stds if std > 20)
+            active_regions = np.count_nonzero(region_stds > 20, axis=1)
             return active_regions / 4.0
+
+
+def _greedy_spread(
+    timestamps: Sequence[float], limit: int, min_interval: float
+) -> List[int]:
+    """
+    Greedy min-interval selection over frames in rank order
+
+    Walks ``timestamps`` in order and picks each frame at least
+    ``min_interval`` away from every frame picked so far, until ``limit``
+    frames are picked. The picked timestamps are kept sorted, so only the
+    two neighbours of each frame need checking: O(log k) per frame rather
+    than a comparison with every pick.
+
+    Returns:
+        Positions in ``timestamps`` of the picked frames, in pick order
+    """
+    picks = []
+    spread = []  # sorted timestamps of the picked frames
+    for rank, timestamp in enumerate(timestamps):
+        i = bisect.bisect_left(spread, timestamp)
+        if (i == 0 or timestamp - spread[i - 1] >= min_interval) and (
+            i == len(spread) or spread[i] - timestamp >= min_interval
+        ):
+            spread.insert(i, timestamp)
+            picks.append(rank)
+            if len(picks) >= limit:
+                break
+    return picks
+
+
+def _frame_reference(frame_data: FrameData) -> FrameData:
+    """Copy of a frame without its pixels, keeping only its position"""
+    return FrameData(
+        pixels=None,
+        timestamp=frame_data.timestamp,
+        frame_number=frame_data.frame_number,
+    )
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most ``size`` items"""
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def score_file_path(video_path: Path) -> Path:
+    """Where the per-sample scores of a video are stored, next to the video"""
+    return video_path.with_name(f"{video_path.stem}.scores.npz")
+
+
+def _segment_previous(
+    extractor: FrameExtractor, selector: FrameSelector, job: Tuple
+) -> Optional[FrameData]:
+    """Sample before a segment, when the selector measures motion against it"""
+    _, _, video_path, start = job[:4]
+    if selector.mode != "action":
+        return None
+    return extractor.previous_sample(video_path, start)
+
+
+def _score_segment(job: Tuple) -> Tuple[ScoredFrames, float, float]:
+    """Worker process entry point for FrameExtractor.extract_scores"""
+    extractor, selector, video_path, start, end = job
+    frames = extractor.iter_frames(video_path, start_frame=start, end_frame=end)
+    scored = selector.score_all(frames, _segment_previous(extractor, selector, job))
+    return scored, selector.decoding_time, selector.scoring_time
+
+
+def _collect_segment_candidates(job: Tuple) -> Tuple[List[Dict], int, float, float]:
+    """Worker process entry point for FrameExtractor.extract_candidates"""
+    extractor, selector, video_path, start, end, count, min_interval, keep_images = job
+    frames = extractor.iter_frames(video_path, start_frame=start, end_frame=end)
+    candidates = selector.collect_candidates(
+        frames,
+        count,
+        min_interval,
+        keep_images,
+        evict_images=True,
+        previous=_segment_previous(extractor, selector, job),
+    )
+    return (
+        candidates,
+        selector.frames_analyzed,
+        selector.decoding_time,
+        selector.scoring_time,
+    )
@@ -0,0 +1,110 @@
+"""
+Shared test setup: a throwaway Postgres database for the API tests
+
+The API creates its tables when it is imported, so the database is chosen
+before any test module is collected: TEST_DATABASE_URL if set, otherwise a
+Postgres container started with testcontainers. API tests are skipped when
+neither is available; they never run against the configured DATABASE_URL.
+"""
+
+import os
+
+import pytest
+
+_container = None
+
+
+def pytest_configure(config):
+    global _container
+
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        try:
+            from testcontainers.postgres import PostgresContainer
+
+            _container = PostgresContainer("postgres:16-alpine", driver="psycopg2")
+            _container.start()
+            url = _container.get_connection_url()
+        except Exception:
+            # testcontainers not installed, or no Docker to run it
+            _container = None
+
+    if url:
+        os.environ["TEST_DATABASE_URL"] = url
+        os.environ["DATABASE_URL"] = url
+
+
+def pytest_unconfigure(config):
+    if _container is not None:
+        _container.stop()
+
+
+@pytest.fixture
+def db():
+    """Database session; every table is emptied after the test"""
+    from api.app.database.connection import SessionLocal
+    from api.app.database.models import Base
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from api.app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Point uploads, results and the result cache at a temporary directory"""
+    from api.app.config import settings
+
+    for name in ("UPLOAD_DIR", "RESULTS_DIR", "CACHE_DIR"):
+        path = tmp_path / name.lower()
+        path.mkdir()
+        monkeypatch.setattr(settings, name, path)
+    return tmp_path
+
+
+@pytest.fixture
+def pending_job(db):
+    """Queued processing job of an anonymous session"""
+    import uuid
+
+    from api.app.database.models import Session, VideoFile
+    from api.app.repositories.processing_repository import ProcessingRepository
+
+    session = Session(session_id=str(uuid.uuid4()), status="processing")
+    db.add(session)
+    db.flush()
+    video = VideoFile(
+        session_id=session.id,
+        original_filename="video.mp4",
+        safe_filename="video.mp4",
+        file_path="/nonexistent.mp4",
+    )
+    db.add(video)
+    db.commit()
+
+    params = {
+        "mode": "profile",
+        "quality": "fast",
+        "count": 1,
+        "sampling": "frames",
+        "sample_rate": 30,
+        "min_interval": 2.0,
+    }
+    return ProcessingRepository(db).create_processing_job(
+        session.id, video.id, params, "FREE", 0, session.session_id
+    )
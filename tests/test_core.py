@@ -0,0 +1,279 @@
+"""
+Tests for frame extraction and selection in frame_picker.core
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from frame_picker.core import (
+    CandidatePool,
+    FaceDetector,
+    FaceTracker,
+    FrameData,
+    FrameExtractor,
+    FrameFeatures,
+    FrameSelector,
+    ProxyCache,
+    ScoredFrames,
+)
+
+FPS = 30.0
+FRAME_SIZE = 96
+
+
+class SquareDetector(FaceDetector):
+    """Detects bright squares as faces, so synthetic videos can have faces"""
+
+    def __init__(self, min_size: int = 10):
+        self.detector = "haar"
+        self.min_size = min_size
+        self.scale_factor = 1.1
+        self._load()
+
+    def _load(self) -> None:
+        self.backend = "squares"
+        self.model = self.backend
+
+    def detect(self, features, region=None):
+        gray = features.gray
+        x, y = 0, 0
+        if region is not None:
+            x, y, w, h = region
+            gray = gray[y : y + h, x : x + w]
+        _, _, stats, _ = cv2.connectedComponentsWithStats((gray > 230).astype(np.uint8))
+        boxes = stats[1:, :4][stats[1:, 4] >= self.min_size**2]
+        return boxes.reshape(-1, 4) + [x, y, 0, 0]
+
+
+def make_frame(rng: np.random.Generator, t: int) -> np.ndarray:
+    """Noisy frame of varying quality with one or two bright squares"""
+    level = rng.integers(40, 140)
+    noise = rng.integers(0, 40) * rng.random((FRAME_SIZE, FRAME_SIZE))
+    gray = np.clip(level + noise, 0, 180).astype(np.uint8)
+
+    # One square drifting slowly, and another one now and then elsewhere
+    x = 8 + (t // 20) % 24
+    gray[4:20, x : x + 16] = 255
+    if (t // 100) % 3 == 1:
+        gray[70:86, 70:86] = 255
+
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory) -> Path:
+    """Short synthetic video, long enough to be split into four segments"""
+    path = tmp_path_factory.mktemp("videos") / "synthetic.avi"
+    writer = cv2.VideoWriter(
+        str(path),
+        cv2.VideoWriter_fourcc(*"MJPG"),
+        FPS,
+        (FRAME_SIZE, FRAME_SIZE),
+    )
+    rng = np.random.default_rng(0)
+    for t in range(1200):
+        writer.write(make_frame(rng, t))
+    writer.release()
+    return path
+
+
+def face_selector(quality: str) -> FrameSelector:
+    """Profile selector finding the squares of the synthetic video"""
+    selector = FrameSelector(mode="profile", quality=quality)
+    selector.face_detector = SquareDetector()
+    selector.face_tracker.detector = selector.face_detector
+    return selector
+
+
+def picked(candidates) -> list:
+    return [candidate["frame"].frame_number for candidate in candidates]
+
+
+def test_missing_models_fall_back_to_balanced_haar_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(FaceDetector, "MODELS_DIR", tmp_path)
+    with pytest.warns(RuntimeWarning, match="falling back to the Haar cascade"):
+        detector = FaceDetector("dnn", min_size=20, scale_factor=1.05)
+
+    assert detector.backend == "cascade"
+    assert detector.min_size == FaceDetector.FALLBACK_MIN_SIZE
+    assert detector.scale_factor == FaceDetector.FALLBACK_SCALE_FACTOR
+
+
+def test_tracker_result_does_not_depend_on_skipped_samples():
+    rng = np.random.default_rng(1)
+    frames = [FrameFeatures(make_frame(rng, t)) for t in range(300)]
+
+    every = FaceTracker(SquareDetector(), redetect_frames=150)
+    searched = [every.update(features, t) for t, features in enumerate(frames)]
+
+    sparse = FaceTracker(SquareDetector(), redetect_frames=150)
+    for t, features in enumerate(frames):
+        faces = sparse.update(features, t, search=t % 7 == 0)
+        if t % 7 == 0 or t % 150 == 0:
+            np.testing.assert_array_equal(faces, searched[t])
+        else:
+            assert faces is None
+
+
+@pytest.mark.parametrize("quality", ["fast", "balanced", "best"])
+@pytest.mark.parametrize("count", [1, 3])
+def test_face_scores_match_with_pruning_and_segments(video_path, quality, count):
+    extractor = FrameExtractor(sample_rate=3)
+    full = face_selector(quality)
+    scores = extractor.extract_scores(video_path, full)
+    expected = scores.frame_numbers[scores.select(count, 2.0)].tolist()
+
+    pruned = face_selector(quality)
+    candidates = extractor.extract_candidates(video_path, pruned, count, 2.0)
+    assert picked(pruned.select_best_candidates(candidates, count, 2.0)) == expected
+
+    extractor = FrameExtractor(sample_rate=3, workers=4)
+    assert len(extractor._segments(video_path, 150)) > 1
+    segmented = face_selector(quality)
+    candidates = extractor.extract_candidates(video_path, segmented, count, 2.0)
+    assert picked(segmented.select_best_candidates(candidates, count, 2.0)) == expected
+
+
+@pytest.mark.parametrize("sampling, sample_rate", [("frames", 3), ("fps", 7)])
+def test_action_scores_match_with_segments(video_path, sampling, sample_rate):
+    serial = FrameExtractor(sample_rate=sample_rate, sampling=sampling)
+    expected = serial.extract_scores(video_path, FrameSelector(mode="action"))
+
+    extractor = FrameExtractor(sample_rate=sample_rate, sampling=sampling, workers=4)
+    assert len(extractor._segments(video_path, 150)) > 1
+    scores = extractor.extract_scores(video_path, FrameSelector(mode="action"))
+    np.testing.assert_array_equal(scores.frame_numbers, expected.frame_numbers)
+    np.testing.assert_array_equal(scores.metrics["motion"], expected.metrics["motion"])
+
+    selector = FrameSelector(mode="action")
+    candidates = extractor.extract_candidates(video_path, selector, 3, 2.0)
+    assert picked(selector.select_best_candidates(candidates, 3, 2.0)) == (
+        expected.frame_numbers[expected.select(3, 2.0)].tolist()
+    )
+
+
+@pytest.mark.parametrize("mode", ["profile", "action"])
+def test_cascade_skips_only_frames_that_cannot_beat_threshold(video_path, mode):
+    frames = FrameExtractor(sample_rate=3).extract_frames(video_path)[:64]
+
+    full = FrameSelector(mode=mode).score_metrics(frames)
+    threshold = float(np.median(full["score"]))
+    pruned = FrameSelector(mode=mode).score_metrics(frames, threshold)
+
+    kept = pruned["score"] > -np.inf
+    assert np.all(full["score"][~kept] <= threshold)
+    np.testing.assert_array_equal(pruned["score"][kept], full["score"][kept])
+    assert np.all(kept[full["score"] > threshold])
+
+
+@pytest.mark.parametrize("mode", ["profile", "action"])
+@pytest.mark.parametrize("count, min_interval", [(1, 2.0), (3, 2.0), (5, 0.5)])
+def test_pruned_selection_matches_full_scoring(video_path, mode, count, min_interval):
+    extractor = FrameExtractor(sample_rate=3)
+
+    scores = extractor.extract_scores(video_path, FrameSelector(mode=mode))
+    expected = scores.frame_numbers[scores.select(count, min_interval)].tolist()
+
+    selector = FrameSelector(mode=mode)
+    candidates = extractor.extract_candidates(video_path, selector, count, min_interval)
+    assert len(candidates) < len(scores)
+    selected = selector.select_best_candidates(candidates, count, min_interval)
+    assert picked(selected) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("count, min_interval", [(1, 1.0), (2, 1.0), (4, 3.0)])
+def test_candidate_pool_keeps_every_selectable_frame(seed, count, min_interval):
+    rng = np.random.default_rng(seed)
+    timestamps = np.sort(rng.uniform(0, 120, 1000))
+    # Coarse scores, so ties between frames are common
+    scores = rng.integers(0, 50, len(timestamps)) / 50
+
+    pool = CandidatePool(count, min_interval)
+    for i, (timestamp, score) in enumerate(zip(timestamps, scores)):
+        pool.add(FrameData(None, float(timestamp), i), float(score))
+
+    candidates = pool.candidates()
+    assert len(candidates) < len(timestamps)
+
+    everything = ScoredFrames(np.arange(len(timestamps)), timestamps, scores)
+    expected = everything.frame_numbers[everything.select(count, min_interval)]
+    selected = FrameSelector().select_best_candidates(candidates, count, min_interval)
+    assert picked(selected) == expected.tolist()
+
+
+@pytest.fixture(scope="module")
+def coded_video_path(tmp_path_factory) -> Path:
+    """Synthetic video with inter-coded frames, which carry motion vectors"""
+    path = tmp_path_factory.mktemp("videos") / "synthetic.mp4"
+    writer = cv2.VideoWriter(
+        str(path),
+        cv2.VideoWriter_fourcc(*"mp4v"),
+        FPS,
+        (FRAME_SIZE, FRAME_SIZE),
+    )
+    rng = np.random.default_rng(2)
+    for t in range(300):
+        writer.write(make_frame(rng, t * (t // 50 + 1)))
+    writer.release()
+    return path
+
+
+def test_motion_sampling_scores_motion_from_motion_vectors(coded_video_path):
+    pytest.importorskip("av")
+    extractor = FrameExtractor(sample_rate=8, sampling="motion")
+    peaks = extractor._motion_peaks(coded_video_path)
+    assert max(peaks.values()) == 1.0
+
+    scores = extractor.extract_scores(coded_video_path, FrameSelector(mode="action"))
+    motion = dict(zip(scores.frame_numbers.tolist(), scores.metrics["motion"]))
+    assert motion == pytest.approx(peaks)
+
+
+def test_segment_workers_store_proxies_of_the_whole_video(video_path, tmp_path):
+    video = tmp_path / video_path.name
+    video.symlink_to(video_path)
+    extractor = FrameExtractor(
+        sample_rate=3, workers=4, proxy_height=48, proxy_cache=ProxyCache()
+    )
+    selector = FrameSelector(mode="profile")
+
+    first = extractor.extract_candidates(video, selector, 3, 2.0)
+    assert [path.name for path in tmp_path.glob("*.proxies.npy")] == [
+        f"{video.stem}.{extractor._proxy_key()}.proxies.npy"
+    ]
+    assert extractor._proxies_cached(video)
+
+    second = extractor.extract_candidates(video, selector, 3, 2.0)
+    assert picked(selector.select_best_candidates(second, 3, 2.0)) == picked(
+        selector.select_best_candidates(first, 3, 2.0)
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, weights",
+    [
+        ("profile", {"brightness": 0.25, "contrast": 0.15}),
+        ("profile", {"contrast": 0.1, "sharpness": 0.4}),
+        ("action", {"brightness": 0.1, "motion": 0.3}),
+        ("profile", {"brightness": 0.1, "face": 0.3}),
+    ],
+)
+def test_weights_may_add_up_to_exactly_one(mode, weights):
+    assert sum(FrameSelector(mode=mode, weights=weights).weights.values()) == (
+        pytest.approx(1.0)
+    )
+    with pytest.raises(ValueError, match="add up to at most 1"):
+        FrameSelector(mode=mode, weights={**weights, "composition": 0.5})
+
+
+def test_motion_sampling_of_undecodable_video_has_no_peaks(tmp_path):
+    pytest.importorskip("av")
+    path = tmp_path / "empty.mp4"
+    path.write_bytes(b"")
+    extractor = FrameExtractor(sample_rate=8, sampling="motion")
+    extractor._scan_motion = lambda video_path: np.empty(0)
+    assert extractor._motion_peaks(path) == {}
@@ -0,0 +1,48 @@
+"""
+Tests for the processing job queue
+"""
+
+import os
+from datetime import timedelta
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("No Postgres test database", allow_module_level=True)
+
+from sqlalchemy.sql import func
+
+from api.app.database.models import FrameResult
+from api.app.repositories.processing_repository import (
+    JobLeaseLost,
+    ProcessingRepository,
+)
+
+FRAME = {"frame_index": 0, "score": 0.5, "timestamp": 1.0}
+
+
+def test_expired_attempt_loses_its_results_and_its_writes(db, pending_job):
+    repo = ProcessingRepository(db)
+    job = pending_job
+    assert repo.claim_next_job("old-worker", 60, 600).id == job.id
+    repo.add_frame_result(job.id, FRAME, worker_id="old-worker")
+
+    repo.update(job, lease_expires_at=func.now() - timedelta(seconds=1))
+    assert repo.requeue_expired_jobs(max_attempts=3, backoff_seconds=0) == [job]
+    assert job.status == "pending"
+    assert db.query(FrameResult).count() == 0
+
+    with pytest.raises(JobLeaseLost):
+        repo.update_job_status(job, "completed", 100, worker_id="old-worker")
+    with pytest.raises(JobLeaseLost):
+        repo.add_frame_result(job.id, FRAME, worker_id="old-worker")
+
+    db.expire_all()
+    assert repo.get_by_id(job.id).status == "pending"
+    assert db.query(FrameResult).count() == 0
+
+    assert repo.claim_next_job("new-worker", 60, 600).id == job.id
+    repo.add_frame_result(job.id, FRAME, worker_id="new-worker")
+    repo.update_job_status(job, "completed", 100, worker_id="new-worker")
+    assert job.status == "completed"
+    assert len(job.frame_results) == 1
@@ -0,0 +1,155 @@
+"""
+Tests for the processing endpoints
+"""
+
+import os
+import uuid
+
+import cv2
+import numpy as np
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("No Postgres test database", allow_module_level=True)
+
+from api.app.database.models import ProcessingJob, Session, User, VideoFile
+from api.app.repositories.processing_repository import ProcessingRepository
+from api.app.utils.jwt import create_access_token
+from frame_picker.core import FrameExtractor, FrameSelector, score_file_path
+
+
+def add_user(db, email: str) -> User:
+    user = User(email=email, password_hash="x", tier="FREE")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def auth_headers(user: User) -> dict:
+    token = create_access_token({"sub": str(user.id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_session(db, status: str = "completed", user: User = None) -> Session:
+    session = Session(
+        session_id=str(uuid.uuid4()),
+        status=status,
+        user_id=user.id if user else None,
+    )
+    db.add(session)
+    db.commit()
+    return session
+
+
+def add_video(db, session: Session, path: str = "/nonexistent.mp4") -> VideoFile:
+    video = VideoFile(
+        session_id=session.id,
+        original_filename="video.mp4",
+        safe_filename="video.mp4",
+        file_path=path,
+        duration=10.0,
+    )
+    db.add(video)
+    db.commit()
+    return video
+
+
+def test_processing_marks_the_session_before_queueing_the_job(client, db):
+    session = add_session(db, status="uploaded")
+    add_video(db, session)
+
+    response = client.post(
+        f"/api/sessions/{session.session_id}/process",
+        json={"mode": "profile", "quality": "fast", "count": 1},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "processing"
+
+    db.expire_all()
+    assert db.get(Session, session.id).status == "processing"
+    job = db.query(ProcessingJob).filter_by(session_id=session.id).one()
+    assert job.status == "pending"
+
+
+def test_rerank_requires_the_session_owner(client, db):
+    session = add_session(db, user=add_user(db, "owner@example.com"))
+    url = f"/api/sessions/{session.session_id}/rerank"
+    body = {"count": 1, "min_interval": 1.0}
+
+    assert client.post(url, json=body).status_code == 403
+
+    other = add_user(db, "other@example.com")
+    response = client.post(url, json=body, headers=auth_headers(other))
+    assert response.status_code == 403
+
+
+def test_rerank_requires_completed_processing(client, db):
+    session = add_session(db, status="uploaded")
+
+    response = client.post(
+        f"/api/sessions/{session.session_id}/rerank",
+        json={"count": 1, "min_interval": 1.0},
+    )
+    assert response.status_code == 400
+
+
+def test_rerank_of_unknown_session_is_not_found(client):
+    response = client.post(
+        f"/api/sessions/{uuid.uuid4()}/rerank", json={"count": 1, "min_interval": 1.0}
+    )
+    assert response.status_code == 404
+
+
+def test_rerank_selects_again_from_stored_scores(client, db, storage):
+    path = storage / "upload_dir" / "video.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 64))
+    rng = np.random.default_rng(0)
+    for _ in range(90):
+        writer.write(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    extractor = FrameExtractor(sample_rate=10)
+    selector = FrameSelector(mode="action", quality="fast")
+    extractor.extract_scores(path, selector).save(
+        score_file_path(path),
+        metadata={
+            "mode": "action",
+            "quality": "fast",
+            "sampling": "frames",
+            "sample_rate": 10,
+        },
+    )
+
+    owner = add_user(db, "owner@example.com")
+    session = add_session(db, user=owner)
+    video = add_video(db, session, str(path))
+    repo = ProcessingRepository(db)
+    job = repo.create_processing_job(
+        session.id,
+        video.id,
+        {
+            "mode": "action",
+            "quality": "fast",
+            "count": 1,
+            "sampling": "frames",
+            "sample_rate": 10,
+            "min_interval": 1.0,
+        },
+        tier="FREE",
+        priority=ProcessingRepository.PRIORITY_NORMAL,
+        owner_key=str(owner.id),
+        status="running",
+    )
+    repo.update_job_status(job, "completed", progress=100)
+
+    response = client.post(
+        f"/api/sessions/{session.session_id}/rerank",
+        json={"count": 2, "min_interval": 1.0},
+        headers=auth_headers(owner),
+    )
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 2
+
+    jobs = repo.get_by_session_id(session.id)
+    assert [job.status for job in jobs] == ["completed", "completed"]
+    assert jobs[0].owner_key == str(owner.id)
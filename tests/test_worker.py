@@ -0,0 +1,71 @@
+"""
+Tests for the processing worker
+"""
+
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("No Postgres test database", allow_module_level=True)
+
+from concurrent.futures import Future
+
+from sqlalchemy.exc import OperationalError
+
+from api.app.config import settings
+from api.app.database.models import JobFailure
+from api.app.repositories.processing_repository import ProcessingRepository
+from api.app.repositories.session_repository import SessionRepository
+from api.app.worker import Worker
+
+
+class IdleExecutor:
+    max_workers = 1
+
+    def submit(self, job_id, request, worker_id) -> Future:
+        # Never finishes, like a job stuck in decoding
+        return Future()
+
+    def shutdown(self) -> None:
+        pass
+
+
+def test_worker_survives_database_errors(db, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_POLL_INTERVAL", 0.01)
+    worker = Worker(IdleExecutor(), worker_id="test-worker")
+
+    claims = []
+
+    def claim_next_job(repo, *args):
+        claims.append(args)
+        if len(claims) == 1:
+            raise OperationalError("SELECT", {}, Exception("connection lost"))
+        worker.stop()
+        return None
+
+    monkeypatch.setattr(ProcessingRepository, "claim_next_job", claim_next_job)
+    worker.run()
+
+    assert len(claims) == 2
+    assert worker._poll_delay(1) == 0.02
+
+
+def test_worker_requeues_jobs_past_their_deadline(db, pending_job, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MIN_TIMEOUT_SECONDS", 0)
+    worker = Worker(IdleExecutor(), worker_id="test-worker")
+    repo = ProcessingRepository(db)
+
+    worker._claim_jobs(repo)
+    assert list(worker.running) == [str(pending_job.id)]
+
+    worker._time_out_jobs(repo, SessionRepository(db))
+    worker._renew_leases(repo)
+
+    db.expire_all()
+    job = repo.get_by_id(pending_job.id)
+    assert job.status == "pending"
+    assert job.lease_expires_at is None
+    assert db.query(JobFailure).one().error == "Job did not finish in time"
+    assert list(worker.running) == [str(job.id)]
+    assert worker.deadlines == {}